@@ -179,6 +179,22 @@ def gs_elements_control_ui(window, g_renderer, gaussians, g_camera, dc_scale_fac
         changed_reduce_updates, g_renderer.reduce_updates = imgui.checkbox(
                 "Reduce updates", g_renderer.reduce_updates,
             )
+
+        # 动态分辨率：交互时降低高斯元的渲染分辨率，相机静止后恢复
+        if hasattr(g_renderer, 'dynamic_resolution'):
+            _, g_renderer.dynamic_resolution = imgui.checkbox(
+                "Dynamic Resolution", g_renderer.dynamic_resolution)
+            if g_renderer.dynamic_resolution:
+                _, g_renderer.dynamic_scale = imgui.slider_float(
+                    "Resolution Scale", g_renderer.dynamic_scale, 0.25, 1.0, "Scale = %.2f")
+                _, target_ms = imgui.slider_float(
+                    "Target Frame Time", g_renderer.target_frame_time * 1000, 5.0, 100.0, "%.0f ms")
+                g_renderer.target_frame_time = target_ms / 1000
+                _, restore_ms = imgui.slider_float(
+                    "Restore After", g_renderer.restore_delay * 1000, 50.0, 2000.0, "%.0f ms")
+                g_renderer.restore_delay = restore_ms / 1000
+                imgui.text(f"frame = {g_renderer.frame_time * 1000:.1f} ms, "
+                           f"{'reduced' if g_renderer.resolution_reduced else 'native'}")
         
         # 添加控制draw_axes的勾选框
         changed_show_axes, show_axes = imgui.checkbox("Show Axes", show_axes)
@@ -357,8 +373,84 @@ def gs_elements_control_ui(window, g_renderer, gaussians, g_camera, dc_scale_fac
         changed_auto_sort, g_auto_sort = imgui.checkbox(
                 "Auto Sort", g_auto_sort,
             )
+        if changed_auto_sort and hasattr(g_renderer, 'set_auto_sort'):
+            g_renderer.set_auto_sort(g_auto_sort)
+        # 排序后端（加载场景时由基准测试自动选择）
+        if hasattr(g_renderer, 'sort_benchmark'):
+            backend_names = g_renderer.sort_backend_names()
+            changed_sort_backend, backend_idx = imgui.combo(
+                "Sort Backend", backend_names.index(g_renderer.current_sort_backend()), backend_names)
+            if changed_sort_backend:
+                g_renderer.select_sort_backend(backend_names[backend_idx])
+                g_renderer.sort_and_update()
+            if g_renderer.sort_benchmark:
+                imgui.text("sort time: " + ", ".join(
+                    f"{name} {t * 1000:.1f} ms" for name, t in g_renderer.sort_benchmark.items()))
+            elif g_renderer.sort_tuning is not None:
+                imgui.text("measuring sort backends...")
+        # 排序前剔除视锥外的高斯元
+        if hasattr(g_renderer, 'frustum_culling'):
+            changed_culling, g_renderer.frustum_culling = imgui.checkbox("Frustum Culling", g_renderer.frustum_culling)
+            if changed_culling:
+                g_renderer.sort_and_update()
+            imgui.same_line()
+            imgui.text(f"visible = {g_renderer.num_instances}")
+        # 在GPU上剔除亚像素、视口外和不透明度过低的高斯元
+        if hasattr(g_renderer, 'splat_culling'):
+            changed_splat_culling, splat_culling = imgui.checkbox("Splat Culling", g_renderer.splat_culling)
+            if changed_splat_culling:
+                g_renderer.set_splat_culling(splat_culling)
+        # 层次细节：远处的高斯元用LOD树中合并后的节点代替
+        if hasattr(g_renderer, 'use_lod'):
+            changed_lod, use_lod = imgui.checkbox("LOD", g_renderer.use_lod)
+            if changed_lod:
+                g_renderer.set_lod_enabled(use_lod)
+            if g_renderer.use_lod:
+                imgui.same_line()
+                changed_lod_error, lod_error = imgui.slider_float(
+                    "LOD Error", g_renderer.lod_error, 0.5, 32.0, "%.1f px")
+                if changed_lod_error:
+                    g_renderer.set_lod_error(lod_error)
+                    g_renderer.sort_and_update()
+                if g_renderer.lod_active:
+                    imgui.text(f"LOD nodes = {len(g_renderer.gaussians)}, leaves = {g_renderer.lod.num_leaves}")
+                else:
+                    imgui.text("Building LOD...")
+        # 使用计算着色器在GPU上排序
+        if g_renderer.gpu_sorter is not None:
+            imgui.same_line()
+            _, g_renderer.gpu_sort = imgui.checkbox("GPU Sort", g_renderer.gpu_sort)
         if g_auto_sort:
-            g_renderer.sort_and_update()
+            imgui.same_line()
+            # 后台线程排序，绘制使用最近完成的排序结果（移动时会滞后一到两帧）
+            _, g_renderer.async_sort = imgui.checkbox("Async", g_renderer.async_sort)
+            g_renderer.auto_sort()
+            # 相机变化在容差内时跳过排序
+            scheduler = g_renderer.sort_scheduler
+            if scheduler is not None:
+                _, scheduler.angle_tolerance = imgui.slider_float(
+                    "Sort Angle Tol", scheduler.angle_tolerance, 0.0, 5.0, "Angle = %.2f°")
+                _, scheduler.distance_tolerance = imgui.slider_float(
+                    "Sort Dist Tol", scheduler.distance_tolerance, 0.0, 0.5, "Distance = %.3f")
+                imgui.text(f"sorts done = {scheduler.sorts_done}, skipped = {scheduler.sorts_skipped}")
+                # 异步排序时按外推到一个排序延迟之后的相机姿态排序
+                if g_renderer.async_sort:
+                    _, scheduler.predictive = imgui.checkbox("Predictive", scheduler.predictive)
+                    imgui.same_line()
+                    imgui.text(f"sort latency = {scheduler.sort_latency * 1000:.1f} ms")
+
+        # 预计算排序图集（结果缓存在PLY文件旁边）
+        if hasattr(g_renderer, 'sort_atlas'):
+            if imgui.button(label='Build Sort Atlas'):
+                g_renderer.build_sort_atlas()
+            atlas = g_renderer.sort_atlas
+            if atlas is not None:
+                imgui.same_line()
+                _, g_renderer.use_sort_atlas = imgui.checkbox("Use Atlas", g_renderer.use_sort_atlas)
+                imgui.same_line()
+                imgui.text(f"{atlas.num_done}/{len(atlas.orders)} directions")
+                _, atlas.max_angle = imgui.slider_float(
+                    "Atlas Max Angle", atlas.max_angle, 0.0, 20.0, "Angle = %.1f°")
 
         # 快速保存（屏幕分辨率）
         if imgui.button(label='Quick Save'):
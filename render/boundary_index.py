@@ -0,0 +1,53 @@
+import itertools
+import numpy as np
+
+
+class BoundaryIndex:
+    """
+    渲染包围盒的空间索引：预先按x、y、z分别排序，查询时先用二分查找取出包围盒所在的坐标区间，
+    只对区间内的点做精确判断。判断规则与util_gau.export_ply一致。
+    """
+
+    def __init__(self, xyz: np.ndarray):
+        self.xyz = np.asarray(xyz, dtype=np.float32)
+        self.orders = [np.argsort(self.xyz[:, axis], kind='stable') for axis in range(3)]
+        self.sorted_coords = [self.xyz[order, axis] for axis, order in enumerate(self.orders)]
+
+    def _candidates(self, lo, hi):
+        """返回坐标落在[lo, hi]区间内的点，选择候选最少的轴"""
+        # 留出浮点误差的余量，精确判断在候选点上进行
+        margin = 1e-5 * (np.abs(lo) + np.abs(hi) + 1)
+        lo, hi = lo - margin, hi + margin
+        best = None
+        for axis in range(3):
+            start = np.searchsorted(self.sorted_coords[axis], lo[axis], side='left')
+            end = np.searchsorted(self.sorted_coords[axis], hi[axis], side='right')
+            if best is None or end - start < best[2] - best[1]:
+                best = (axis, start, end)
+        axis, start, end = best
+        return self.orders[axis][start:end]
+
+    def mask(self, enable_aabb, enable_obb, points_center, cube_min, cube_max, rotation):
+        """包围盒内的高斯元的布尔掩码，没有启用包围盒时返回None"""
+        if not enable_aabb and not enable_obb:
+            return None
+        points_center = np.asarray(points_center, dtype=np.float32)
+        cube_min = np.asarray(cube_min, dtype=np.float32)
+        cube_max = np.asarray(cube_max, dtype=np.float32)
+        mask = np.zeros(len(self.xyz), dtype=bool)
+        if enable_obb:
+            # 旋转后包围盒的轴对齐外包框，候选点再变换到包围盒坐标系中判断
+            rotation = np.asarray(rotation, dtype=np.float32)
+            corners = np.array(list(itertools.product(*zip(cube_min, cube_max))), dtype=np.float32)
+            world = points_center + corners @ rotation.T
+            candidates = self._candidates(world.min(axis=0), world.max(axis=0))
+            local = (self.xyz[candidates] - points_center) @ rotation
+            inside = np.all((local >= cube_min) & (local <= cube_max), axis=1)
+        else:
+            # 与export_ply相同：point - center 位于 [center + min, center + max]
+            lo, hi = 2 * points_center + cube_min, 2 * points_center + cube_max
+            candidates = self._candidates(lo, hi)
+            local = self.xyz[candidates] - points_center
+            inside = np.all((local >= points_center + cube_min) & (local <= points_center + cube_max), axis=1)
+        mask[candidates[inside]] = True
+        return mask
@@ -0,0 +1,227 @@
+import os
+import threading
+from concurrent.futures import Future
+import numpy as np
+from scipy.spatial.transform import Rotation
+import util
+import util_gau
+from .sort_atlas import SortAtlas
+
+
+def _morton_order(xyz: np.ndarray) -> np.ndarray:
+    """按Morton编码（每轴10位）排序，空间上相邻的高斯元在顺序中也相邻"""
+    lo, hi = xyz.min(axis=0), xyz.max(axis=0)
+    grid = ((xyz - lo) / np.maximum(hi - lo, 1e-12) * 1023).astype(np.uint32)
+    code = np.zeros(len(xyz), dtype=np.uint32)
+    for bit in range(10):
+        for axis in range(3):
+            code |= ((grid[:, axis] >> bit) & 1) << (3 * bit + axis)
+    return np.argsort(code, kind='stable')
+
+
+def _area(scale: np.ndarray) -> np.ndarray:
+    """椭球投影面积的近似，扁平的高斯元不会因某个轴为0而被忽略"""
+    s0, s1, s2 = scale[:, 0], scale[:, 1], scale[:, 2]
+    return s0 * s1 + s1 * s2 + s0 * s2
+
+
+class GaussianLOD:
+    """
+    高斯元的层次细节树。叶子为原始高斯元（按Morton顺序），每branching个相邻节点合并为一个父节点，
+    父节点按矩匹配合并：位置为加权均值，协方差为子节点协方差加上子节点均值的离散度，
+    颜色（球谐系数）为加权平均，权重为 不透明度 * 面积。
+    运行时从根节点向下选择一个截面：节点在屏幕上的半径不超过error_budget像素时绘制该节点，否则展开其子节点；
+    包围球在视锥外的节点连同其子树一起剔除。
+    构建较慢，可以用tools/build_lod.py离线构建并保存在PLY文件旁边，或用build_async在后台线程中构建。
+    """
+
+    def __init__(self, gaus: util_gau.GaussianData, branching: int = 8):
+        # 逐节点的数据以float32计算（N×3×3的协方差减半），离散度相对父节点均值计算，不会因坐标较大而损失精度
+        order = _morton_order(np.asarray(gaus.xyz, dtype=np.float64))
+        xyz = np.asarray(gaus.xyz, dtype=np.float32)[order]
+        rot = np.asarray(gaus.rot, dtype=np.float32)[order]
+        scale = np.asarray(gaus.scale, dtype=np.float32)[order]
+        opacity = np.asarray(gaus.opacity, dtype=np.float32)[order]
+        sh = np.asarray(gaus.sh, dtype=np.float32)[order]
+        cov = self._covariance(rot, scale)
+        bound = 3 * scale.max(axis=1)
+
+        levels_xyz, levels_rot, levels_scale, levels_opacity, levels_sh = [xyz], [rot], [scale], [opacity], [sh]
+        levels_bound = [bound]
+        level_offsets = [0]  # 每层第一个节点在全部节点中的位置
+        children_start = [np.full(len(xyz), -1, dtype=np.int64)]
+        num_nodes = len(xyz)
+        while len(xyz) > 1:
+            starts = np.arange(0, len(xyz), branching)
+            parent = np.arange(len(xyz)) // branching
+            weight = opacity[:, 0] * _area(scale) + np.float32(1e-12)
+            weight_sum = np.add.reduceat(weight, starts)
+            mean = np.add.reduceat(weight[:, None] * xyz, starts) / weight_sum[:, None]
+            # Σ_p = E[Σ + (μ - μ_p)(μ - μ_p)^T]
+            offset = xyz - mean[parent]
+            second = offset[:, :, None] * offset[:, None, :]
+            second += cov
+            second *= weight[:, None, None]
+            cov = np.add.reduceat(second, starts) / weight_sum[:, None, None]
+            del second
+            sh = np.add.reduceat(weight[:, None] * sh, starts) / weight_sum[:, None]
+            covered = np.add.reduceat(opacity[:, 0] * _area(scale), starts)
+            rot, scale = self._decompose(cov)
+            opacity = np.clip(covered / np.maximum(_area(scale), 1e-12), 0.0, 1.0)[:, None]
+            # 包围球包含全部子节点的包围球，剔除父节点时不会漏掉可见的子节点
+            reach = np.linalg.norm(offset, axis=1) + bound
+            bound = np.maximum(np.maximum.reduceat(reach, starts), 3 * scale.max(axis=1))
+            xyz = mean
+
+            level_offsets.append(num_nodes)
+            children_start.append(level_offsets[-2] + starts)
+            num_nodes += len(xyz)
+            levels_xyz.append(xyz)
+            levels_rot.append(rot)
+            levels_scale.append(scale)
+            levels_opacity.append(opacity)
+            levels_sh.append(sh)
+            levels_bound.append(bound)
+
+        sizes = np.diff(np.append(level_offsets, num_nodes))
+        children_count = [np.zeros(sizes[0], dtype=np.int64)]
+        for level in range(1, len(sizes)):
+            count = np.full(sizes[level], branching, dtype=np.int64)
+            count[-1] = sizes[level - 1] - branching * (sizes[level] - 1)
+            children_count.append(count)
+        nodes = util_gau.GaussianData(
+            xyz=np.concatenate(levels_xyz),
+            rot=np.concatenate(levels_rot),
+            scale=np.concatenate(levels_scale),
+            opacity=np.concatenate(levels_opacity),
+            sh=np.concatenate(levels_sh),
+            path=gaus.path,
+        )
+        self._assign(gaus, branching, np.array(level_offsets, dtype=np.int64), order,
+                     np.concatenate(children_start), np.concatenate(children_count),
+                     nodes, np.concatenate(levels_bound))
+
+    def _assign(self, gaus, branching, level_offsets, leaf_order, children_start, children_count, nodes, bound):
+        self.source = gaus
+        self.branching = branching
+        self.level_offsets = level_offsets
+        self.leaf_order = leaf_order  # 叶子节点对应的原始高斯元
+        self.num_leaves = len(leaf_order)
+        self.children_start = children_start
+        self.children_count = children_count
+        self.gaussians = nodes
+        # 节点在3D空间中的半径（3-sigma），用于计算屏幕空间误差
+        self.radius = 3 * self.gaussians.scale.max(axis=1)
+        # 节点子树的包围球半径，用于视锥剔除和计算到相机的最近距离
+        self.bound = bound.astype(np.float32, copy=False)
+        self.root = len(self.gaussians) - 1
+
+    @staticmethod
+    def _covariance(rot, scale):
+        # 四元数为(w, x, y, z)，与gau_cov3d_comp.glsl一致：Σ = R S^2 R^T
+        w, x, y, z = (rot / np.linalg.norm(rot, axis=1, keepdims=True)).T
+        R = np.stack([
+            1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y),
+            2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x),
+            2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y),
+        ], axis=1).reshape(-1, 3, 3)
+        return (R * (scale ** 2)[:, None, :]) @ R.transpose(0, 2, 1)
+
+    @staticmethod
+    def _decompose(cov):
+        eigenvalues, eigenvectors = np.linalg.eigh(cov)
+        # 保证为右手系的旋转矩阵
+        flip = np.linalg.det(eigenvectors) < 0
+        eigenvectors[flip, :, 0] *= -1
+        quat = Rotation.from_matrix(eigenvectors).as_quat()[:, [3, 0, 1, 2]].astype(np.float32)
+        scale = np.sqrt(np.maximum(eigenvalues, 1e-12))
+        return quat, scale
+
+    @staticmethod
+    def cache_path(gaus):
+        """缓存文件放在PLY文件旁边"""
+        if not gaus.path:
+            return None
+        return os.path.splitext(gaus.path)[0] + ".lod.npz"
+
+    def save(self, path):
+        nodes = self.gaussians
+        np.savez(path, fingerprint=SortAtlas.fingerprint(self.source.xyz), branching=self.branching,
+                 level_offsets=self.level_offsets, leaf_order=self.leaf_order,
+                 children_start=self.children_start, children_count=self.children_count,
+                 xyz=nodes.xyz, rot=nodes.rot, scale=nodes.scale, opacity=nodes.opacity, sh=nodes.sh,
+                 bound=self.bound)
+        print(f"LOD saved to {path}")
+
+    @classmethod
+    def load(cls, path, gaus):
+        """读取缓存，文件不存在或与当前数据不匹配时返回None"""
+        if path is None or not os.path.exists(path):
+            return None
+        with np.load(path) as cache:
+            if str(cache['fingerprint']) != SortAtlas.fingerprint(gaus.xyz):
+                return None
+            nodes = util_gau.GaussianData(xyz=cache['xyz'], rot=cache['rot'], scale=cache['scale'],
+                                          opacity=cache['opacity'], sh=cache['sh'], path=gaus.path)
+            lod = cls.__new__(cls)
+            lod._assign(gaus, int(cache['branching']), cache['level_offsets'], cache['leaf_order'],
+                        cache['children_start'], cache['children_count'], nodes, cache['bound'])
+        return lod
+
+    @classmethod
+    def build_async(cls, gaus, branching: int = 8, cache_path=None) -> Future:
+        """在后台线程中构建，完成后写入缓存文件（可选），返回的Future在构建完成后给出GaussianLOD"""
+        future = Future()
+
+        def build():
+            try:
+                lod = cls(gaus, branching)
+            except Exception as e:
+                future.set_exception(e)
+                return
+            if cache_path is not None:
+                try:
+                    lod.save(cache_path)
+                except OSError as e:
+                    print(f"Failed to save LOD to {cache_path}: {e}")
+            future.set_result(lod)
+
+        threading.Thread(target=build, name="gs_lod_build", daemon=True).start()
+        return future
+
+    def select(self, view_matrix, proj_matrix, height, error_budget: float = 2.0, orthographic: bool = False,
+               near: float = 0.001, guard_band: float = 1.3):
+        """
+        自顶向下选择截面，返回全部节点上的布尔掩码
+        Args:
+            view_matrix, proj_matrix: 相机矩阵
+            height: 视口高度（像素）
+            error_budget: 允许的节点屏幕半径，单位为像素
+            near: 相机近平面距离，节点到相机的距离不小于该值
+            guard_band: 视锥剔除时左右上下平面放宽的NDC范围，与_frustum_visible一致
+        """
+        view_matrix = np.asarray(view_matrix, dtype=np.float32)
+        planes = util.frustum_planes(np.asarray(proj_matrix, dtype=np.float32) @ view_matrix, guard_band)
+        pixels_per_unit = abs(float(proj_matrix[1][1])) * height / 2
+        selected = np.zeros(len(self.gaussians), dtype=bool)
+        frontier = np.array([self.root], dtype=np.int64)
+        while len(frontier):
+            xyz = self.gaussians.xyz[frontier]
+            bound = self.bound[frontier]
+            # 包围球完全在视锥外（包括完全在近平面之后）的节点不绘制也不展开
+            inside = np.all(xyz @ planes[:, :3].T + planes[:, 3] + bound[:, None] >= 0, axis=1)
+            frontier, xyz, bound = frontier[inside], xyz[inside], bound[inside]
+            radius = self.radius[frontier] * pixels_per_unit
+            if not orthographic:
+                # 用包围球上离相机最近的点计算误差，相机在包围球内时按近平面处理
+                depth = -(xyz @ view_matrix[2, :3] + view_matrix[2, 3])
+                radius = radius / np.maximum(depth - bound, near)
+            leaf = self.children_count[frontier] == 0
+            keep = leaf | (radius <= error_budget)
+            selected[frontier[keep]] = True
+            expand = frontier[~keep]
+            counts = self.children_count[expand]
+            # 展开为各子节点的连续区间
+            offsets = np.repeat(self.children_start[expand] - np.cumsum(counts) + counts, counts)
+            frontier = offsets + np.arange(counts.sum())
+        return selected
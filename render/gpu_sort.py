@@ -0,0 +1,87 @@
+from OpenGL import GL as gl
+import numpy as np
+from .shader_manager import get_shader_manager
+
+
+class ComputeShaderSorter:
+    """
+    OpenGL 4.3计算着色器排序：由已上传的gaussian_data计算深度键，在GPU上双调排序，
+    结果直接写入gaussian_order（binding 1），不需要在CPU和GPU之间传输数据
+    """
+    LOCAL_SIZE = 256  # 与sort_bitonic_comp.glsl中的LOCAL_SIZE一致
+    BLOCK_SIZE = 2 * LOCAL_SIZE  # 共享内存中一次排序的元素个数
+
+    def __init__(self):
+        shader_manager = get_shader_manager()
+        self.program_keys = shader_manager.get('shaders/sort_keys_comp.glsl').id
+        self.program_sort = shader_manager.get('shaders/sort_bitonic_comp.glsl').id
+        # 每次排序要派发上百次，缓存uniform位置
+        self.keys_uniforms = {name: gl.glGetUniformLocation(self.program_keys, name)
+                              for name in ("view_matrix", "sh_dim", "num_gaussians", "num_padded")}
+        self.sort_uniforms = {name: gl.glGetUniformLocation(self.program_sort, name)
+                              for name in ("sort_mode", "stage_k", "stage_j")}
+        self.order_bufferid = None
+        self.key_bufferid = None
+        self.capacity = 0
+
+    @staticmethod
+    def is_supported():
+        major = gl.glGetIntegerv(gl.GL_MAJOR_VERSION)
+        minor = gl.glGetIntegerv(gl.GL_MINOR_VERSION)
+        return (major, minor) >= (4, 3)
+
+    def _ensure_capacity(self, num_padded):
+        if num_padded <= self.capacity:
+            return
+        if self.order_bufferid is None:
+            self.order_bufferid, self.key_bufferid = gl.glGenBuffers(2)
+        for buffer_id in (self.order_bufferid, self.key_bufferid):
+            gl.glBindBuffer(gl.GL_SHADER_STORAGE_BUFFER, buffer_id)
+            gl.glBufferData(gl.GL_SHADER_STORAGE_BUFFER, num_padded * 4, None, gl.GL_DYNAMIC_COPY)
+        gl.glBindBuffer(gl.GL_SHADER_STORAGE_BUFFER, 0)
+        self.capacity = num_padded
+
+    def sort(self, num_gaussians, sh_dim, view_matrix):
+        """gaussian_data需已绑定到binding 0，排序后gaussian_order绑定到binding 1"""
+        num_padded = max(self.BLOCK_SIZE, 1 << max(int(num_gaussians) - 1, 1).bit_length())
+        self._ensure_capacity(num_padded)
+        gl.glBindBufferBase(gl.GL_SHADER_STORAGE_BUFFER, 1, self.order_bufferid)
+        gl.glBindBufferBase(gl.GL_SHADER_STORAGE_BUFFER, 2, self.key_bufferid)
+
+        # 计算排序键
+        gl.glUseProgram(self.program_keys)
+        gl.glUniformMatrix4fv(self.keys_uniforms["view_matrix"], 1, gl.GL_FALSE,
+                              np.ascontiguousarray(np.asarray(view_matrix, dtype=np.float32).T))
+        gl.glUniform1i(self.keys_uniforms["sh_dim"], int(sh_dim))
+        gl.glUniform1i(self.keys_uniforms["num_gaussians"], int(num_gaussians))
+        gl.glUniform1i(self.keys_uniforms["num_padded"], num_padded)
+        gl.glDispatchCompute(num_padded // self.LOCAL_SIZE, 1, 1)
+        gl.glMemoryBarrier(gl.GL_SHADER_STORAGE_BARRIER_BIT)
+
+        # 双调排序：跨度不超过LOCAL_SIZE的步骤在共享内存中完成
+        gl.glUseProgram(self.program_sort)
+        num_blocks = num_padded // self.BLOCK_SIZE
+        gl.glUniform1i(self.sort_uniforms["sort_mode"], 2)
+        gl.glDispatchCompute(num_blocks, 1, 1)
+        gl.glMemoryBarrier(gl.GL_SHADER_STORAGE_BARRIER_BIT)
+        k = 2 * self.BLOCK_SIZE
+        while k <= num_padded:
+            gl.glUniform1i(self.sort_uniforms["stage_k"], k)
+            gl.glUniform1i(self.sort_uniforms["sort_mode"], 0)
+            j = k >> 1
+            while j > self.LOCAL_SIZE:
+                gl.glUniform1i(self.sort_uniforms["stage_j"], j)
+                gl.glDispatchCompute(num_padded // 2 // self.LOCAL_SIZE, 1, 1)
+                gl.glMemoryBarrier(gl.GL_SHADER_STORAGE_BARRIER_BIT)
+                j >>= 1
+            gl.glUniform1i(self.sort_uniforms["sort_mode"], 1)
+            gl.glUniform1i(self.sort_uniforms["stage_j"], j)
+            gl.glDispatchCompute(num_blocks, 1, 1)
+            gl.glMemoryBarrier(gl.GL_SHADER_STORAGE_BARRIER_BIT)
+            k <<= 1
+
+    def delete(self):
+        if self.order_bufferid is not None:
+            gl.glDeleteBuffers(2, [self.order_bufferid, self.key_bufferid])
+            self.order_bufferid = self.key_bufferid = None
+            self.capacity = 0
@@ -2,8 +2,8 @@ from OpenGL import GL as gl
 import numpy as np
 import ctypes
 from typing import Optional
-import util
 from .base import PrimitiveBase
+from ..shader_manager import get_shader_manager
 
 class AxesHelper(PrimitiveBase):
     """坐标轴辅助器，用于绘制XYZ轴"""
@@ -18,7 +18,7 @@ class AxesHelper(PrimitiveBase):
         super().__init__()
         self.length = length
         # 加载着色器
-        self.program = util.load_shaders('shaders/axes_vert.glsl', 'shaders/axes_frag.glsl')
+        self.program = get_shader_manager().get('shaders/axes_vert.glsl', 'shaders/axes_frag.glsl')
         self.init_buffers()
         
     def set_length(self, length: float):
@@ -71,9 +71,8 @@ class AxesHelper(PrimitiveBase):
             view_matrix: 4x4视图矩阵
             projection_matrix: 4x4投影矩阵
         """
-        gl.glUseProgram(self.program)
-        util.set_uniform_mat4(self.program, view_matrix, "view_matrix")
-        util.set_uniform_mat4(self.program, projection_matrix, "projection_matrix")
+        self.program.set_mat4("view_matrix", view_matrix)
+        self.program.set_mat4("projection_matrix", projection_matrix)
         self.needs_update = False
 
     def draw(self, view_matrix: np.ndarray, projection_matrix: np.ndarray, 
@@ -95,7 +94,7 @@ class AxesHelper(PrimitiveBase):
         if self.needs_update:
             self.update_matrices(view_matrix, projection_matrix)
 
-        gl.glUseProgram(self.program)
+        self.program.use()
         
         # 构建模型矩阵
         model_mat = np.eye(4, dtype=np.float32)
@@ -112,7 +111,7 @@ class AxesHelper(PrimitiveBase):
         if position is not None:
             model_mat[0:3, 3] = position
             
-        util.set_uniform_mat4(self.program, model_mat, "model_matrix")
+        self.program.set_mat4("model_matrix", model_mat)
 
         # 设置线宽并绘制
         gl.glLineWidth(line_width)
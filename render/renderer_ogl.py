@@ -3,6 +3,12 @@ import util
 import util_gau
 import numpy as np
 import ctypes
+import os
+import json
+import time
+import platform
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 
 try:
     from OpenGL.raw.WGL.EXT.swap_control import wglSwapIntervalEXT
@@ -10,12 +16,41 @@ except:
     wglSwapIntervalEXT = None
 
 from .primitives.axes import AxesHelper
+from .sort_scheduler import SortScheduler
+from .gpu_sort import ComputeShaderSorter
+from .sort_atlas import SortAtlas
+from .streaming_buffer import StreamingStorageBuffer
+from .gaussian_lod import GaussianLOD
+from .boundary_index import BoundaryIndex
+from .shader_program import UniformBuffer
+from .shader_manager import get_shader_manager
+
+# 逐帧状态的uniform块（binding 0），顺序与gau_preprocess_comp.glsl、boundary_box_vert.glsl中的frame_data一致
+FRAME_UNIFORM_FIELDS = [
+    ('view_matrix', 'mat4'),
+    ('projection_matrix', 'mat4'),
+    ('hfovxy_focal', 'vec3'),
+    ('screen_display_scale_factor', 'float'),
+    ('cam_pos', 'vec3'),
+    ('dc_factor', 'float'),
+    ('color_scale_factors', 'vec3'),
+    ('extra_factor', 'float'),
+    ('light_rotation', 'vec3'),
+    ('points_center', 'vec3'),
+    ('cubeMin', 'vec3'),
+    ('cubeMax', 'vec3'),
+    ('cube_rotation', 'mat3'),
+]
 
 _sort_buffer_xyz = None
-_sort_buffer_gausid = None  # used to tell whether gaussian is reloaded
+_sort_buffer_gaus = None  # used to tell whether gaussian is reloaded, keeps a reference so its id is not reused
 
-def _sort_gaussian_cpu(gaus, view_mat):
+# 未优化的argsort排序，作为基准测试的对照
+# 各排序后端的ids为视锥剔除后可见高斯元的编号，只对这些高斯元排序，返回值都是gaus中的编号
+def _sort_gaussian_cpu(gaus, view_mat, ids=None):
     xyz = np.asarray(gaus.xyz)
+    if ids is not None:
+        xyz = xyz[ids]
     view_mat = np.asarray(view_mat)
 
     # 使用矩阵乘法和广播计算深度
@@ -23,17 +58,173 @@ def _sort_gaussian_cpu(gaus, view_mat):
     depth = xyz_view[:, 2]
 
     index = np.argsort(depth)
+    if ids is not None:
+        index = ids[index]
     index = index.astype(np.int32).reshape(-1, 1)
     return index
 
-def _sort_gaussian_cupy(gaus, view_mat):
+# Preallocated buffers of the radix sort, rebuilt when another scene is loaded
+_RADIX_KEY_BITS = 16  # 16 bit keys need one radix pass, 32 bit keys need two
+_radix_buffers = {}
+
+def _get_radix_buffers(gaus):
+    global _radix_buffers
+    if _radix_buffers.get('gaus') is not gaus:
+        num = len(gaus)
+        _radix_buffers = {
+            'gaus': gaus,
+            'xyz': np.ascontiguousarray(gaus.xyz, dtype=np.float32),
+            'depth': np.empty(num, dtype=np.float32),
+            'depth_subset': np.empty(num, dtype=np.float32),
+            'key': np.empty(num, dtype=np.uint32),
+            'key_sorted': np.empty(num, dtype=np.uint32),
+            'digit': np.empty(num, dtype=np.uint16),
+        }
+    return _radix_buffers
+
+def _sort_gaussian_cpu_radix(gaus, view_mat, ids=None, key_bits=None):
+    key_bits = key_bits or _RADIX_KEY_BITS
+    buffers = _get_radix_buffers(gaus)
+    view_mat = np.asarray(view_mat, dtype=np.float32)
+
+    # 只计算视图变换的z行
+    depth = np.dot(buffers['xyz'], view_mat[2, :3], out=buffers['depth'])
+    depth += view_mat[2, 3]
+    if ids is not None:
+        # 剔除后从完整场景的深度中取出可见部分，缓冲区仍按完整场景预分配
+        depth = np.take(depth, ids, out=buffers['depth_subset'][:len(ids)])
+    num = len(depth)
+    if num == 0:
+        return np.empty((0, 1), dtype=np.int32)
+
+    # 在可见深度范围内量化（相机看向-z，z >= 0 的点在相机后方）
+    near = min(float(depth.max()), 0.0)
+    far = float(depth.min())
+    if near <= far:
+        near = far + 1.0
+    np.clip(depth, far, near, out=depth)
+    depth -= far
+    # 最大键值取float32在2^key_bits以下的最大值，避免转换时溢出
+    key_max = float(np.nextafter(np.float32(2 ** key_bits), np.float32(0)))
+    depth *= key_max / (near - far)
+
+    # LSD基数排序：numpy对16位整数的stable排序就是基数排序
+    digit = buffers['digit'][:num]
+    if key_bits <= 16:
+        np.copyto(digit, depth, casting='unsafe')
+        index = np.argsort(digit, kind='stable')
+    else:
+        key = buffers['key'][:num]
+        np.copyto(key, depth, casting='unsafe')
+        np.copyto(digit, key, casting='unsafe')  # 低16位
+        index = np.argsort(digit, kind='stable')
+        np.right_shift(key, 16, out=key)
+        key_sorted = np.take(key, index, out=buffers['key_sorted'][:num])
+        np.copyto(digit, key_sorted, casting='unsafe')  # 高16位
+        index = index[np.argsort(digit, kind='stable')]
+
+    if ids is not None:
+        index = ids[index]
+    index = index.astype(np.int32).reshape(-1, 1)
+    return index
+
+# 多线程CPU排序：numpy的dot和argsort会释放GIL，线程池即可并行
+_SORT_NUM_THREADS = os.cpu_count() or 1
+_sort_thread_pool = None
+
+def _get_sort_thread_pool():
+    global _sort_thread_pool
+    if _sort_thread_pool is None:
+        _sort_thread_pool = ThreadPoolExecutor(max_workers=_SORT_NUM_THREADS, thread_name_prefix="gs_sort")
+    return _sort_thread_pool
+
+def _sort_gaussian_cpu_parallel(gaus, view_mat, ids=None, num_threads=None):
+    num_threads = num_threads or _SORT_NUM_THREADS
+    num = len(gaus) if ids is None else len(ids)
+    # 数据量太小时线程调度的开销大于收益
+    if num_threads <= 1 or num < num_threads * 65536:
+        return _sort_gaussian_cpu_radix(gaus, view_mat, ids)
+
+    pool = _get_sort_thread_pool()
+    buffers = _get_radix_buffers(gaus)
+    xyz, keys = buffers['xyz'], buffers['digit']
+    view_mat = np.asarray(view_mat, dtype=np.float32)
+
+    def split(total):
+        bounds = np.linspace(0, total, num_threads + 1).astype(np.int64)
+        return [slice(bounds[i], bounds[i + 1]) for i in range(num_threads)]
+    chunks = split(num)
+
+    # 1. 分块计算深度（只计算视图变换的z行）
+    def compute_depth(chunk):
+        chunk_depth = np.dot(xyz[chunk], view_mat[2, :3], out=buffers['depth'][chunk])
+        chunk_depth += view_mat[2, 3]
+        return float(chunk_depth.min()), float(chunk_depth.max())
+    if ids is None:
+        depth = buffers['depth']
+        depth_ranges = list(pool.map(compute_depth, chunks))
+    else:
+        # 剔除后先计算完整场景的深度，再分块取出可见部分
+        list(pool.map(compute_depth, split(len(gaus))))
+        depth = buffers['depth_subset'][:num]
+        def gather_depth(chunk):
+            chunk_depth = np.take(buffers['depth'], ids[chunk], out=depth[chunk])
+            return float(chunk_depth.min()), float(chunk_depth.max())
+        depth_ranges = list(pool.map(gather_depth, chunks))
+    far = min(r[0] for r in depth_ranges)
+    near = min(max(r[1] for r in depth_ranges), 0.0)
+    if near <= far:
+        near = far + 1.0
+    key_scale = float(np.nextafter(np.float32(2 ** 16), np.float32(0))) / (near - far)
+
+    # 2. 分块量化为16位键并做基数排序，同时统计键的直方图
+    def sort_chunk(chunk):
+        chunk_depth = depth[chunk]
+        np.clip(chunk_depth, far, near, out=chunk_depth)
+        chunk_depth -= far
+        chunk_depth *= key_scale
+        chunk_keys = keys[chunk]
+        np.copyto(chunk_keys, chunk_depth, casting='unsafe')
+        order = np.argsort(chunk_keys, kind='stable')
+        sorted_keys = chunk_keys[order]
+        order += chunk.start
+        return order, sorted_keys, np.bincount(sorted_keys, minlength=2 ** 16)
+    sorted_chunks = list(pool.map(sort_chunk, chunks))
+
+    # 3. 按直方图把键空间划分为数量相近的深度桶，每个线程负责一个桶
+    cumulative = np.cumsum(sum(histogram for _, _, histogram in sorted_chunks))
+    targets = np.arange(1, num_threads) * (num / num_threads)
+    splitters = np.concatenate([[0], np.searchsorted(cumulative, targets) + 1, [2 ** 16]])
+    positions = [np.searchsorted(sorted_keys, splitters) for _, sorted_keys, _ in sorted_chunks]
+    bucket_sizes = sum(np.diff(p) for p in positions)
+    offsets = np.concatenate([[0], np.cumsum(bucket_sizes)])
+
+    # 4. 各桶内对来自各块的有序片段做k路归并（稳定排序保证与单线程结果一致），直接写入输出
+    index = np.empty(num, dtype=np.int32)
+    def merge_bucket(bucket):
+        parts = [(order[p[bucket]:p[bucket + 1]], sorted_keys[p[bucket]:p[bucket + 1]])
+                 for (order, sorted_keys, _), p in zip(sorted_chunks, positions)]
+        bucket_order = np.concatenate([part[0] for part in parts])
+        bucket_keys = np.concatenate([part[1] for part in parts])
+        merged = np.argsort(bucket_keys, kind='stable')
+        index[offsets[bucket]:offsets[bucket + 1]] = bucket_order[merged]
+    list(pool.map(merge_bucket, range(num_threads)))
+
+    if ids is not None:
+        index = ids[index]
+    return index.reshape(-1, 1)
+
+def _sort_gaussian_cupy(gaus, view_mat, ids=None):
     import cupy as cp
-    global _sort_buffer_gausid, _sort_buffer_xyz
-    if _sort_buffer_gausid != id(gaus):
+    global _sort_buffer_gaus, _sort_buffer_xyz
+    if _sort_buffer_gaus is not gaus:
         _sort_buffer_xyz = cp.asarray(gaus.xyz)
-        _sort_buffer_gausid = id(gaus)
+        _sort_buffer_gaus = gaus
 
     xyz = _sort_buffer_xyz
+    if ids is not None:
+        # 完整场景的xyz只上传一次，剔除后在GPU上取出可见部分
+        xyz = xyz[cp.asarray(ids)]
     view_mat = cp.asarray(view_mat)
 
     xyz_view = view_mat[None, :3, :3] @ xyz[..., None] + view_mat[None, :3, 3, None]
@@ -43,44 +234,213 @@ def _sort_gaussian_cupy(gaus, view_mat):
     index = index.astype(cp.int32).reshape(-1, 1)
 
     index = cp.asnumpy(index) # convert to numpy
+    if ids is not None:
+        index = ids[index]
     return index
 
-def _sort_gaussian_torch(gaus, view_mat):
-    global _sort_buffer_gausid, _sort_buffer_xyz
-    if _sort_buffer_gausid != id(gaus):
+def _sort_gaussian_torch(gaus, view_mat, ids=None):
+    global _sort_buffer_gaus, _sort_buffer_xyz
+    if _sort_buffer_gaus is not gaus:
         _sort_buffer_xyz = torch.tensor(gaus.xyz).cuda()
-        _sort_buffer_gausid = id(gaus)
+        _sort_buffer_gaus = gaus
 
     xyz = _sort_buffer_xyz
+    if ids is not None:
+        # 完整场景的xyz只上传一次，剔除后在GPU上取出可见部分
+        xyz = xyz[torch.from_numpy(ids).cuda().long()]
     view_mat = torch.tensor(view_mat).cuda()
     xyz_view = view_mat[None, :3, :3] @ xyz[..., None] + view_mat[None, :3, 3, None]
     depth = xyz_view[:, 2, 0]
     index = torch.argsort(depth)
     index = index.type(torch.int32).reshape(-1, 1).cpu().numpy()
+    if ids is not None:
+        index = ids[index]
     return index
 
 
-# Decide which sort to use
-_sort_gaussian = None
+# 排序后端共享预分配的缓冲区，同步排序和后台排序不能同时进行
+_sort_lock = threading.Lock()
+
+# Detect available sort backends
+_sort_backends = {}
 try:
     import torch
     if not torch.cuda.is_available():
         raise ImportError
-    print("Detect torch cuda installed, will use torch as sorting backend")
-    _sort_gaussian = _sort_gaussian_torch
+    print("Detect torch cuda installed")
+    _sort_backends['torch'] = _sort_gaussian_torch
+except ImportError:
+    pass
+try:
+    import cupy as cp
+    print("Detect cupy installed")
+    _sort_backends['cupy'] = _sort_gaussian_cupy
 except ImportError:
+    pass
+if _SORT_NUM_THREADS > 1:
+    _sort_backends['cpu_parallel'] = _sort_gaussian_cpu_parallel
+_sort_backends['cpu'] = _sort_gaussian_cpu_radix
+_sort_backends['argsort'] = _sort_gaussian_cpu
+
+# Decide which sort to use: torch -> cupy -> cpu, may be replaced by the benchmark after a scene is loaded
+_sort_backend_name = next(iter(_sort_backends))
+_sort_gaussian = _sort_backends[_sort_backend_name]
+print(f"Use {_sort_backend_name} as sorting backend")
+
+def set_sort_backend(name):
+    global _sort_gaussian, _sort_backend_name
+    with _sort_lock:
+        _sort_backend_name = name
+        _sort_gaussian = _sort_backends[name]
+
+def benchmark_sort_backends(gaus, view_mat, repeats=3):
+    """在实际数据上测量每个可用后端的排序时间（秒，预热一次后取中位数）"""
+    times = {}
+    for name, sort_func in _sort_backends.items():
+        try:
+            samples = []
+            for _ in range(repeats + 1):
+                # 每次排序单独持有锁，在后台测量时其他线程的排序最多等待一次
+                with _sort_lock:
+                    start = time.perf_counter()
+                    sort_func(gaus, view_mat)
+                    samples.append(time.perf_counter() - start)
+            # 第一次为预热：分配缓冲区、上传数据到GPU
+            times[name] = float(np.median(samples[1:]))
+        except Exception as e:
+            print(f"Sort backend {name} failed in benchmark: {e}")
+    return times
+
+def benchmark_sort_backends_async(gaus, view_mat, repeats=3) -> Future:
+    """在后台线程中运行benchmark_sort_backends，返回的Future在测量完成后给出各后端的时间"""
+    future = Future()
+    view_mat = np.array(view_mat, copy=True)
+
+    def run():
+        try:
+            future.set_result(benchmark_sort_backends(gaus, view_mat, repeats))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="gs_sort_benchmark", daemon=True).start()
+    return future
+
+# 基准测试结果按机器、GPU、可用后端和场景规模（2的幂）缓存
+_SORT_BENCHMARK_CACHE = os.path.join(os.path.expanduser("~"), ".gsviewer", "sort_benchmark.json")
+
+def _sort_benchmark_key(num_gaussians, backend_names):
+    renderer = gl.glGetString(gl.GL_RENDERER)
+    renderer = renderer.decode(errors='replace') if renderer else "unknown"
+    size_bucket = 1 << max(int(num_gaussians) - 1, 0).bit_length()
+    return f"{platform.node()}|{renderer}|{','.join(sorted(backend_names))}|{size_bucket}"
+
+def _load_sort_benchmark(key):
     try:
-        import cupy as cp
-        print("Detect cupy installed, will use cupy as sorting backend")
-        _sort_gaussian = _sort_gaussian_cupy
-    except ImportError:
-        _sort_gaussian = _sort_gaussian_cpu
+        with open(_SORT_BENCHMARK_CACHE, 'r', encoding='utf-8') as f:
+            return json.load(f).get(key)
+    except (OSError, ValueError):
+        return None
+
+def _save_sort_benchmark(key, times):
+    try:
+        os.makedirs(os.path.dirname(_SORT_BENCHMARK_CACHE), exist_ok=True)
+        try:
+            with open(_SORT_BENCHMARK_CACHE, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        cache[key] = times
+        with open(_SORT_BENCHMARK_CACHE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        print(f"Failed to save sort benchmark: {e}")
+
+def _frustum_visible(xyz, radius, view_proj, guard_band=1.3):
+    """
+    3-sigma包围球与视锥（含近平面和远平面）相交的高斯元。
+    左右上下平面放宽到着色器提前剔除使用的1.3倍NDC范围，不会剔除着色器仍会绘制的高斯元，
+    也给排序调度器容差内的小幅移动留出余量。
+    """
+    planes = util.frustum_planes(view_proj, guard_band)
+    visible = np.ones(len(xyz), dtype=bool)
+    for plane in planes:
+        distance = np.dot(xyz, plane[:3])
+        distance += plane[3] + radius
+        visible &= distance >= 0
+    return visible
+
+def _filter_index(index, visible):
+    """从排序结果中按掩码取出可见的部分，保持排序顺序"""
+    if visible is None:
+        return index
+    return index[visible[index.reshape(-1)]]
+
+def sort_gaussian(gaus, view_mat, visible=None):
+    with _sort_lock:
+        # 视锥内没有高斯元（如相机背对场景）
+        if visible is not None and not visible.any():
+            return np.empty((0, 1), dtype=np.int32)
+        if visible is None:
+            return _sort_gaussian(gaus, view_mat)
+        # 视锥剔除后只对可见的高斯元排序，后端的缓存仍以完整场景为键
+        visible_ids = np.flatnonzero(visible).astype(np.int32)
+        return _sort_gaussian(gaus, view_mat, visible_ids)
+
+
+class AsyncGaussianSorter:
+    """
+    后台排序线程：渲染线程每帧提交最新的视图矩阵，后台线程总是对最新提交的请求排序，
+    未处理的旧请求会被直接覆盖。渲染线程通过fetch取得最近完成的结果。
+    """
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._request = None  # (generation, gaus, view_mat, visible, submit_time)
+        self._result = None  # (generation, index, submit_time, visible)
+        self._thread = None
+
+    def submit(self, generation, gaus, view_mat, visible=None):
+        with self._condition:
+            self._request = (generation, gaus, np.array(view_mat, copy=True), visible, time.perf_counter())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="gs_async_sort", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def fetch(self):
+        with self._condition:
+            result, self._result = self._result, None
+        return result
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    while self._request is None:
+                        self._condition.wait()
+                    generation, gaus, view_mat, visible, submit_time = self._request
+                    self._request = None
+                # 排序出错时只丢弃这一次请求，线程继续处理之后的请求
+                try:
+                    index = sort_gaussian(gaus, view_mat, visible)
+                except Exception as e:
+                    print(f"Async sort failed: {e!r}")
+                    continue
+                with self._condition:
+                    self._result = (generation, index, submit_time, visible)
+        finally:
+            # 线程意外退出时，下一次submit重新启动后台线程
+            with self._condition:
+                self._thread = None
 
 
 class GaussianRenderBase:
     def __init__(self):
         self.gaussians = None
         self._reduce_updates = True
+        self.async_sort = False
+        self.sort_scheduler = None
+        self.gpu_sorter = None
+        self.gpu_sort = False
 
     @property
     def reduce_updates(self):
@@ -100,6 +460,15 @@ class GaussianRenderBase:
     def sort_and_update(self):
         raise NotImplementedError()
 
+    def sort_and_update_async(self):
+        self.sort_and_update()
+
+    def auto_sort(self):
+        if self.async_sort:
+            self.sort_and_update_async()
+        else:
+            self.sort_and_update()
+
     def set_scale_modifier(self, modifier: float):
         raise NotImplementedError()
     
@@ -143,9 +512,19 @@ class OpenGLRenderer(GaussianRenderBase):
         self.axes_helper = AxesHelper(length=1.0)
         self.show_axes = True  # 添加标志以控制轴的显示
 
-        self.program = util.load_shaders('shaders/gau_vert.glsl', 'shaders/gau_frag.glsl')
-        self.program_boundary_box = util.load_shaders('shaders/boundary_box_vert.glsl','shaders/boundary_box_frag.glsl')
-        self.program_axes = util.load_shaders('shaders/axes_vert.glsl', 'shaders/axes_frag.glsl')  # 加载轴的着色器
+        shader_manager = get_shader_manager()
+        self.program = shader_manager.get('shaders/gau_vert.glsl', 'shaders/gau_frag.glsl')
+        # 逐高斯元的预处理在计算着色器中完成，高斯元相关的uniform都设置在该程序上
+        self.program_preprocess = shader_manager.get('shaders/gau_preprocess_comp.glsl')
+        # 3D协方差只在数据、缩放因子或旋转因子改变时重新计算
+        self.program_cov3d = shader_manager.get('shaders/gau_cov3d_comp.glsl')
+        # 预处理时剔除不产生片段的高斯元，再按绘制顺序压缩，间接绘制只绘制剩余的高斯元
+        self.program_scan = shader_manager.get('shaders/gau_scan_comp.glsl')
+        self.program_compact = shader_manager.get('shaders/gau_compact_comp.glsl')
+        self.program_boundary_box = shader_manager.get('shaders/boundary_box_vert.glsl', 'shaders/boundary_box_frag.glsl')
+        # 相机、颜色调整系数和包围盒参数放在一个uniform块中，每帧绘制前上传一次
+        self.frame_uniforms = UniformBuffer(FRAME_UNIFORM_FIELDS, binding=0)
+        self.program_axes = shader_manager.get('shaders/axes_vert.glsl', 'shaders/axes_frag.glsl')  # 与AxesHelper共用同一个程序
 
         # Vertex data for a quad
         self.quad_v = np.array([
@@ -160,12 +539,90 @@ class OpenGLRenderer(GaussianRenderBase):
         ], dtype=np.uint32).reshape(2, 3)
         
         # load quad geometry
-        vao, buffer_id = util.set_attributes(self.program, ["position"], [self.quad_v])
+        vao, buffer_id = util.set_attributes(self.program.id, ["position"], [self.quad_v])
         util.set_faces_tovao(vao, self.quad_f)
         self.vao = vao
         self.ebo = util.set_faces_tovao(self.vao, self.quad_f)
         self.gau_bufferid = None
-        self.index_bufferid = None
+        self.splat_bufferid = None  # 预处理结果，每个高斯元64字节
+        self.cov3d_bufferid = None  # 预计算的3D协方差，每个高斯元6个float
+        self.cov3d_dirty = True
+        self.visible_bufferid = None  # 剔除并压缩后的绘制列表，每个高斯元一个int
+        self.group_bufferid = None  # 每个工作组的可见数量/起始位置
+        # DrawElementsIndirectCommand：count, instanceCount, firstIndex, baseVertex, baseInstance
+        self.draw_command = np.array([self.quad_f.size, 0, 0, 0, 0], dtype=np.uint32)
+        self.draw_command_bufferid = gl.glGenBuffers(1)
+        gl.glBindBuffer(gl.GL_DRAW_INDIRECT_BUFFER, self.draw_command_bufferid)
+        gl.glBufferData(gl.GL_DRAW_INDIRECT_BUFFER, self.draw_command.nbytes, self.draw_command, gl.GL_DYNAMIC_DRAW)
+        gl.glBindBuffer(gl.GL_DRAW_INDIRECT_BUFFER, 0)
+        gl.glBindBufferBase(gl.GL_SHADER_STORAGE_BUFFER, 6, self.draw_command_bufferid)
+        self.splat_culling = True
+        self.program_preprocess.set_1i("cull_splats", 1)
+        # 双缓冲的排序索引，新的排序结果写入后缓冲区后再切换为绘制使用的前缓冲区
+        self.index_buffer = StreamingStorageBuffer(num_slots=2)
+        self.sort_generation = 0  # 数据重新加载或同步排序后，丢弃后台线程中过期的结果
+        self.async_sorter = AsyncGaussianSorter()
+        self.async_sort = True
+        self.sort_scheduler = SortScheduler()
+        # 没有CUDA排序后端时，优先使用计算着色器在GPU上排序
+        try:
+            if ComputeShaderSorter.is_supported():
+                self.gpu_sorter = ComputeShaderSorter()
+        except Exception as e:
+            print(f"Compute shader sort is not available: {e}")
+        self.gpu_sort = self.gpu_sorter is not None and _sort_gaussian in (_sort_gaussian_cpu_radix, _sort_gaussian_cpu_parallel)
+        if self.gpu_sort:
+            print("Use OpenGL compute shader as sorting backend")
+        # 排序前按3-sigma包围球做视锥剔除，只排序和绘制可见的高斯元
+        self.frustum_culling = True
+        # 最近一次CPU排序的结果和参与排序的高斯元掩码（None为全部），相机改变后从中重新剔除
+        self.sorted_index = None
+        self.sorted_mask = None
+        self.draw_index = None  # 剔除后实际绘制的索引
+        self.cull_dirty = False
+        # 与界面的Auto Sort一致。关闭时相机移动不会排序，排序时保留视锥外的高斯元，之后只需重新过滤
+        self.auto_sort_enabled = False
+        self.scale_modifier = 1.0
+        self.cull_radius = None
+        self.num_instances = 0
+        # 加载场景后在实际数据上测量各排序后端并选择最快的
+        self.auto_tune_sort = True
+        self.sort_benchmark = {}
+        # 进行中的测量：(高斯数据, 缓存键, CPU后端测量的Future, GPU排序的逐帧时间, 重复次数)，完成前保持默认后端
+        self.sort_tuning = None
+        # 可选的预计算排序图集，视线方向接近预计算方向时不需要排序
+        self.sort_atlas = None
+        self.use_sort_atlas = False
+        # 层次细节：排序和绘制LOD树的一个截面，远处用合并后的节点代替原始高斯元
+        self.source_gaussians = None
+        self.lod = None
+        self.use_lod = False
+        self.lod_build = None  # 后台构建中的(高斯数据, Future)，构建完成前绘制原始高斯元
+        self.lod_error = 2.0  # 节点在屏幕上允许的半径，单位为像素
+        # 渲染包围盒：在CPU上生成包围盒内的高斯元列表，只排序和绘制这些高斯元
+        self.boundary = dict(enable_aabb=0, enable_obb=0, points_center=np.zeros(3, dtype=np.float32),
+                             cube_min=np.zeros(3, dtype=np.float32), cube_max=np.zeros(3, dtype=np.float32),
+                             rotation=np.eye(3, dtype=np.float32))
+        self.boundary_index = None
+        self.boundary_mask = None
+        self.boundary_dirty = False
+
+        # 高斯元先渲染到离屏帧缓冲，没有任何变化时直接复用上一帧（Reduce updates）
+        self.render_size = (int(w), int(h))
+        self.frame_fbo = None
+        self.frame_texture = None
+        self.frame_size = None
+        self.frame_key = None
+        self.need_rerender = True
+        # 动态分辨率：拖动相机或帧时间超过目标时降低离屏渲染的分辨率，再双线性放大到窗口
+        self.dynamic_resolution = False
+        self.dynamic_scale = 0.5
+        self.target_frame_time = 1 / 30  # 秒
+        self.restore_delay = 0.3  # 相机静止超过该时间（秒）后恢复原始分辨率
+        self.frame_time = 0.0  # 渲染帧之间的时间，指数滑动平均
+        self.resolution_reduced = False
+        self._last_frame_start = None
+        self._last_interaction = 0.0
 
         # initial box 初始包围盒
         self.switch_show_boundary_box = False
@@ -176,6 +633,7 @@ class OpenGLRenderer(GaussianRenderBase):
         self.ebo_box_lines = None
         self.box_vertices_count_triangles = 0
         self.box_vertices_count_lines = 0
+        self.box_params = None
 
         # opengl settings
         gl.glDisable(gl.GL_CULL_FACE)
@@ -183,19 +641,33 @@ class OpenGLRenderer(GaussianRenderBase):
         gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
 
         # 设置初始值color_scale_factors
-        util.set_uniform_v3(self.program, [1.0, 1.0, 1.0], "color_scale_factors")
+        self.frame_uniforms.set("color_scale_factors", [1.0, 1.0, 1.0])
         # 设置初始值DC特征的调整系数dc_factor
-        util.set_uniform_1f(self.program, 1.0, "dc_factor")
+        self.frame_uniforms.set("dc_factor", 1.0)
         # 设置初始值extra_factor
-        util.set_uniform_1f(self.program, 1.0, "extra_factor")
+        self.frame_uniforms.set("extra_factor", 1.0)
+        self.frame_uniforms.set("cube_rotation", np.eye(3, dtype=np.float32))
 
         self.update_vsync()
 
     def __del__(self):
         # 清理资源
-        gl.glDeleteBuffers(1, [self.vbo_box])
-        gl.glDeleteBuffers(1, [self.ebo_box_triangles])
-        gl.glDeleteBuffers(1, [self.ebo_box_lines])
+        if self.gpu_sorter is not None:
+            self.gpu_sorter.delete()
+        self.index_buffer.delete()
+        self.frame_uniforms.delete()
+        if self.splat_bufferid is not None:
+            gl.glDeleteBuffers(1, [self.splat_bufferid])
+        if self.frame_fbo is not None:
+            gl.glDeleteFramebuffers(1, [self.frame_fbo])
+            gl.glDeleteTextures(1, [self.frame_texture])
+        if self.cov3d_bufferid is not None:
+            gl.glDeleteBuffers(1, [self.cov3d_bufferid])
+        if self.visible_bufferid is not None:
+            gl.glDeleteBuffers(2, [self.visible_bufferid, self.group_bufferid])
+        gl.glDeleteBuffers(1, [self.draw_command_bufferid])
+        # 包围盒的缓冲区在第一次绘制包围盒时才创建
+        self.clear_boundary_box()
         gl.glDeleteVertexArrays(1, [self.vao_box])
 
     def update_vsync(self):
@@ -205,107 +677,449 @@ class OpenGLRenderer(GaussianRenderBase):
             print("VSync is not supported")
 
     def update_gaussian_data(self, gaus: util_gau.GaussianData):
+        self.need_rerender = True
+        self.source_gaussians = gaus
+        if self.use_lod:
+            lod = self._request_lod(gaus)
+            if lod is not None:
+                # 上传LOD树的全部节点（叶子为原始高斯元），排序时只选择截面上的节点
+                gaus = lod.gaussians
         self.gaussians = gaus
+        self.boundary_index = None
+        self.boundary_mask = None
+        self.sort_generation += 1
+        self.sort_scheduler.invalidate()
+        self.sorted_index = None
+        self.sorted_mask = None
+        self.cull_radius = 3 * np.max(gaus.scale, axis=1).astype(np.float32)
+        self.sort_atlas = None
         # load gaussian geometry
         gaussian_data = gaus.flat()
         self.gau_bufferid = util.set_storage_buffer_data(
-            self.program, 
+            self.program.id, 
             "gaussian_data", 
             gaussian_data, 
             bind_idx=0,
             buffer_id=self.gau_bufferid)
-        util.set_uniform_1int(self.program, gaus.sh_dim, "sh_dim")
+        self.program_preprocess.set_1i("sh_dim", gaus.sh_dim)
+        self.program_cov3d.set_1i("sh_dim", gaus.sh_dim)
+        if self.splat_bufferid is None:
+            self.splat_bufferid, self.cov3d_bufferid, self.visible_bufferid, self.group_bufferid = gl.glGenBuffers(4)
+        num_groups = (len(gaus) + 255) // 256
+        for buffer_id, bind_idx, nbytes in ((self.splat_bufferid, 3, max(len(gaus), 1) * 64),
+                                            (self.cov3d_bufferid, 4, max(len(gaus), 1) * 24),
+                                            (self.visible_bufferid, 5, max(len(gaus), 1) * 4),
+                                            (self.group_bufferid, 7, max(num_groups, 1) * 4)):
+            gl.glBindBuffer(gl.GL_SHADER_STORAGE_BUFFER, buffer_id)
+            gl.glBufferData(gl.GL_SHADER_STORAGE_BUFFER, nbytes, None, gl.GL_DYNAMIC_COPY)
+            gl.glBindBufferBase(gl.GL_SHADER_STORAGE_BUFFER, bind_idx, buffer_id)
+        gl.glBindBuffer(gl.GL_SHADER_STORAGE_BUFFER, 0)
+        self.cov3d_dirty = True
+        if self.auto_tune_sort:
+            self.autotune_sort_backend()
 
     # 针对高斯元对象调整
     # 更新DC特征的调整系数并应用所有调整
     def adjust_dc_features(self, dc_factor):
-        util.set_uniform_1f(self.program, dc_factor, "dc_factor")
+        self.need_rerender = True
+        self.frame_uniforms.set("dc_factor", dc_factor)
     # 更新额外特征的调整系数并应用所有调整
     def adjust_extra_features(self, extra_factor):
-        util.set_uniform_1f(self.program, extra_factor, "extra_factor")
+        self.need_rerender = True
+        self.frame_uniforms.set("extra_factor", extra_factor)
     # 更新颜色调整系数并应用所有调整
     def update_color_factor(self, g_rgb_factor):
-        util.set_uniform_v3(self.program, g_rgb_factor, "color_scale_factors")
+        self.need_rerender = True
+        self.frame_uniforms.set("color_scale_factors", g_rgb_factor)
     # 设置旋转修改因子
     def set_rot_modifier(self, modifier):
+        self.need_rerender = True
         quat = util.euler_to_quaternion(modifier[0], modifier[1], modifier[2])
-        util.set_uniform_4f(self.program, "rot_modifier", quat.x, quat.y, quat.z, quat.w)
+        self.program_cov3d.set_4f("rot_modifier", quat.x, quat.y, quat.z, quat.w)
+        self.cov3d_dirty = True
     # 设置光照旋转因子
     def set_light_rotation(self, lightRotation):
+        self.need_rerender = True
         # rotation参数是一个包含三个元素的列表或元组，分别代表绕X、Y、Z轴的旋转角度
-        util.set_uniform_v3(self.program, lightRotation, "light_rotation")
+        self.frame_uniforms.set("light_rotation", lightRotation)
+
+    def _upload_sort_index(self, index):
+        self.need_rerender = True
+        self.draw_index = index
+        if len(index) == 0:
+            # 没有可见的高斯元，绘制时跳过预处理和高斯元的绘制
+            self.num_instances = 0
+            return
+        # 写入后缓冲区并绑定到binding 1，正在使用前缓冲区的绘制命令不会被阻塞
+        self.index_buffer.write(index.astype(np.int32, copy=False), bind_idx=1)
+        self.num_instances = len(index)
+
+    @property
+    def camera_culling(self):
+        """按相机剔除（视锥剔除或LOD截面），只在CPU排序时使用"""
+        return (self.frustum_culling or self.lod_active) and not self.use_gpu_sort
+
+    def _visible_gaussians(self, view_matrix=None):
+        # 后台排序按外推的相机姿态剔除，与排序使用同一个视图矩阵
+        if view_matrix is None:
+            view_matrix = self.view_matrix
+        visible = None
+        if self.frustum_culling:
+            view_proj = self.proj_matrix @ view_matrix
+            visible = _frustum_visible(self.gaussians.xyz, self.cull_radius * self.scale_modifier, view_proj)
+        if self.lod_active:
+            cut = self.lod.select(view_matrix, self.proj_matrix, self.render_size[1],
+                                  self.lod_error / self.scale_modifier, self.camera.use_orthographic,
+                                  near=self.camera.znear)
+            visible = cut if visible is None else visible & cut
+        inside = self._boundary_mask()
+        if inside is not None:
+            visible = inside if visible is None else visible & inside
+        return visible
+
+    @property
+    def use_gpu_sort(self):
+        # LOD截面和渲染包围盒需要逐个选择高斯元，只在CPU上排序
+        boundary = self.boundary['enable_aabb'] or self.boundary['enable_obb']
+        return self.gpu_sort and not self.lod_active and not boundary
+
+    @property
+    def lod_active(self):
+        """LOD树已经构建并上传"""
+        return self.use_lod and self.lod is not None and self.gaussians is self.lod.gaussians
+
+    def _request_lod(self, gaus):
+        """返回gaus的LOD树：优先读取PLY旁边的缓存，没有缓存时在后台构建并返回None，构建完成后由poll_lod_build切换"""
+        if self.lod is not None and self.lod.source is gaus:
+            return self.lod
+        if self.lod_build is not None and self.lod_build[0] is gaus:
+            return None
+        cache_path = GaussianLOD.cache_path(gaus)
+        lod = GaussianLOD.load(cache_path, gaus)
+        if lod is not None:
+            self.lod = lod
+            return lod
+        self.lod_build = (gaus, GaussianLOD.build_async(gaus, cache_path=cache_path))
+        return None
+
+    def poll_lod_build(self):
+        if self.lod_build is None or not self.lod_build[1].done():
+            return
+        gaus, future = self.lod_build
+        self.lod_build = None
+        try:
+            lod = future.result()
+        except Exception as e:
+            print(f"Failed to build LOD: {e!r}")
+            return
+        # 构建期间加载了其他场景时丢弃结果
+        if gaus is not self.source_gaussians:
+            return
+        self.lod = lod
+        if self.use_lod:
+            self.update_gaussian_data(gaus)
+            self.sort_and_update()
+
+    def set_lod_enabled(self, enabled: bool):
+        self.use_lod = enabled
+        if self.source_gaussians is None:
+            return
+        lod = self._request_lod(self.source_gaussians) if enabled else None
+        target = lod.gaussians if lod is not None else self.source_gaussians
+        # LOD树还在构建时继续绘制已上传的原始高斯元，不重新上传
+        if target is not self.gaussians:
+            self.update_gaussian_data(self.source_gaussians)
+            self.sort_and_update()
+
+    def set_lod_error(self, error: float):
+        self.lod_error = error
+        self.sort_scheduler.invalidate()
+        self.cull_dirty = True
+
+    def sort_backend_names(self):
+        names = list(_sort_backends)
+        if self.gpu_sorter is not None:
+            names.append('gpu')
+        return names
+
+    def current_sort_backend(self):
+        return 'gpu' if self.gpu_sort else _sort_backend_name
+
+    def select_sort_backend(self, name):
+        self.gpu_sort = name == 'gpu'
+        if not self.gpu_sort:
+            set_sort_backend(name)
+
+    def _time_gpu_sort(self):
+        gl.glFinish()  # 不计入之前的绘制命令
+        start = time.perf_counter()
+        self.gpu_sorter.sort(len(self.gaussians), self.gaussians.sh_dim, self.view_matrix)
+        gl.glFinish()
+        elapsed = time.perf_counter() - start
+        if not self.use_gpu_sort:
+            # GPU排序的结果绑定到了binding 1，恢复CPU排序的索引
+            self.index_buffer.bind(1)
+        return elapsed
+
+    def autotune_sort_backend(self, repeats=3):
+        """
+        在实际数据上测量各排序后端并选择最快的。命中缓存时立即切换，否则CPU后端在后台线程中测量，
+        GPU排序在之后的绘制中每帧测量一次，全部完成前保持默认后端，由poll_sort_tuning切换。
+        """
+        key = _sort_benchmark_key(len(self.gaussians), self.sort_backend_names())
+        times = _load_sort_benchmark(key)
+        if times:
+            self.sort_tuning = None
+            self._apply_sort_benchmark(times)
+            return
+        self.sort_benchmark = {}
+        future = benchmark_sort_backends_async(self.gaussians, self.view_matrix, repeats)
+        self.sort_tuning = (self.gaussians, key, future, [], repeats)
+
+    def poll_sort_tuning(self):
+        if self.sort_tuning is None:
+            return
+        gaus, key, future, gpu_samples, repeats = self.sort_tuning
+        # 测量期间加载了其他场景时丢弃结果
+        if gaus is not self.gaussians:
+            self.sort_tuning = None
+            return
+        if not future.done():
+            return
+        # GPU排序只能在渲染线程中测量，每帧测量一次，第一次为预热
+        if self.gpu_sorter is not None and len(gpu_samples) < repeats + 1:
+            gpu_samples.append(self._time_gpu_sort())
+            return
+        self.sort_tuning = None
+        try:
+            times = future.result()
+        except Exception as e:
+            print(f"Failed to benchmark sort backends: {e!r}")
+            return
+        if gpu_samples:
+            times['gpu'] = float(np.median(gpu_samples[1:]))
+        _save_sort_benchmark(key, times)
+        backend = self.current_sort_backend()
+        self._apply_sort_benchmark(times)
+        # 已经按默认后端排序过，切换后按新的后端重新排序
+        if self.current_sort_backend() != backend:
+            self.sort_and_update()
+
+    def _apply_sort_benchmark(self, times):
+        names = self.sort_backend_names()
+        times = {name: t for name, t in times.items() if name in names}
+        self.sort_benchmark = times
+        if not times:
+            return
+        best = min(times, key=times.get)
+        self.select_sort_backend(best)
+        print(f"Sort benchmark ({len(self.gaussians)} gaussians): " +
+              ", ".join(f"{name} {t * 1000:.1f} ms" for name, t in times.items()) + f", use {best}")
+
+    def build_sort_atlas(self, subdivisions=1, max_angle=5.0):
+        # 优先读取PLY旁边的缓存，否则在后台线程中计算并写入缓存
+        cache_path = SortAtlas.cache_path(self.gaussians)
+        atlas = SortAtlas.load(cache_path, self.gaussians, max_angle)
+        if atlas is None:
+            atlas = SortAtlas(self.gaussians, subdivisions, max_angle)
+            atlas.build_async(cache_path=cache_path)
+        self.sort_atlas = atlas
+        self.use_sort_atlas = True
+
+    def _atlas_index(self, visible, view_matrix):
+        if not self.use_sort_atlas or self.sort_atlas is None:
+            return None
+        index = self.sort_atlas.lookup(view_matrix)
+        if index is not None:
+            index = _filter_index(index, visible)
+        return index
+
+    def _set_sort_result(self, index, sort_mask, visible):
+        self.sorted_index, self.sorted_mask = index, sort_mask
+        self.cull_dirty = False
+        self._upload_sort_index(index if visible is sort_mask else _filter_index(index, visible))
 
     def sort_and_update(self):
-        index = _sort_gaussian(self.gaussians, self.view_matrix)
-        self.index_bufferid = util.set_storage_buffer_data(
-            self.program, 
-            "gi", 
-            index, 
-            bind_idx=1,
-            buffer_id=self.index_bufferid
-        )
+        self.sort_generation += 1
+        if self.use_gpu_sort:
+            # 排序结果直接写入GPU上的gaussian_order并绑定到binding 1（不做剔除，由顶点着色器丢弃屏幕外的高斯元）
+            self.gpu_sorter.sort(len(self.gaussians), self.gaussians.sh_dim, self.view_matrix)
+            self.need_rerender = True
+            self.num_instances = len(self.gaussians)
+            self.sorted_index = None
+            self.sort_scheduler.mark_sorted(self.view_matrix)
+            return
+        visible = self._visible_gaussians()
+        # 关闭自动排序时也对视锥外（和LOD截面外）的高斯元排序，相机改变后从完整的排序结果中重新剔除
+        sort_mask = self._boundary_mask() if self.camera_culling and not self.auto_sort_enabled else visible
+        index = self._atlas_index(sort_mask, self.view_matrix)
+        if index is None:
+            index = sort_gaussian(self.gaussians, self.view_matrix, sort_mask)
+        self._set_sort_result(index, sort_mask, visible)
+        self.sort_scheduler.mark_sorted(self.view_matrix)
         return
+
+    def recull(self):
+        """
+        相机改变后重新剔除，与是否开启自动排序无关：从最近一次排序的结果中过滤出当前可见的部分。
+        可见集合超出了参与排序的高斯元时（新进入视锥或LOD截面展开），需要重新排序。
+        """
+        self.cull_dirty = False
+        if not self.camera_culling or self.sorted_index is None:
+            return
+        visible = self._visible_gaussians()
+        if self.sorted_mask is None or not np.any(visible & ~self.sorted_mask):
+            self._upload_sort_index(_filter_index(self.sorted_index, visible))
+        elif self.auto_sort_enabled and self.async_sort:
+            self.sort_and_update_async()
+        else:
+            self.sort_and_update()
+
+    def poll_async_sort(self):
+        # 切换到后台线程最近完成的排序结果
+        result = self.async_sorter.fetch()
+        if result is not None and result[0] == self.sort_generation:
+            _, index, submit_time, visible = result
+            self.sorted_index, self.sorted_mask = index, visible
+            self._upload_sort_index(index)
+            # 从提交到开始使用的时间，用于预测排序时的相机姿态
+            self.sort_scheduler.update_latency(time.perf_counter() - submit_time)
+
+    def sort_and_update_async(self):
+        self.poll_async_sort()
+        # 结果要在一个排序延迟之后才会被使用，按外推的相机姿态排序
+        view_matrix = self.sort_scheduler.predict_view_matrix(self.view_matrix)
+        visible = self._visible_gaussians(view_matrix)
+        index = self._atlas_index(visible, view_matrix)
+        if index is not None:
+            self.sort_generation += 1  # 丢弃后台线程中更早提交的结果
+            self._set_sort_result(index, visible, visible)
+        else:
+            self.async_sorter.submit(self.sort_generation, self.gaussians, view_matrix, visible)
+            self.cull_dirty = False
+        self.sort_scheduler.mark_sorted(self.view_matrix, predicted=view_matrix is not self.view_matrix)
+
+    def auto_sort(self):
+        # 后台排序的结果需要每帧检查，与本帧是否提交新的排序无关
+        if self.async_sort:
+            self.poll_async_sort()
+        if not self.sort_scheduler.should_sort(self.view_matrix, self.camera, self.camera_culling):
+            return
+        # GPU排序的命令本身就是异步执行的，不需要后台线程
+        if self.async_sort and not self.use_gpu_sort:
+            self.sort_and_update_async()
+        else:
+            self.sort_and_update()
    
     def set_scale_modifier(self, modifier):
-        util.set_uniform_1f(self.program, modifier, "gaussian_scale_factor")
+        self.need_rerender = True
+        self.program_cov3d.set_1f("gaussian_scale_factor", modifier)
+        self.cov3d_dirty = True
+        self.scale_modifier = modifier
+        self.sort_scheduler.invalidate()  # 剔除半径随之改变
+        self.cull_dirty = True
     
     def set_screen_scale_factor(self, factor):
-        util.set_uniform_1f(self.program, factor, "screen_display_scale_factor")
+        self.need_rerender = True
+        self.frame_uniforms.set("screen_display_scale_factor", factor)
+
+    def set_auto_sort(self, enabled: bool):
+        # 关闭后第一次重新剔除时，如果上一次只排序了可见的部分，会对全部高斯元重新排序
+        self.auto_sort_enabled = enabled
+
+    def set_splat_culling(self, enabled: bool):
+        self.need_rerender = True
+        self.splat_culling = enabled
+        self.program_preprocess.set_1i("cull_splats", int(enabled))
 
     def set_render_mod(self, mod: int):
-        util.set_uniform_1int(self.program, mod, "render_mod")
+        self.need_rerender = True
+        self.program_preprocess.set_1i("render_mod", mod)
+        self.program.set_1i("render_mod", mod)  # 片段着色器也使用
 
     def set_render_reso(self, w, h):
+        self.need_rerender = True
+        self.render_size = (int(w), int(h))
         gl.glViewport(0, 0, w, h)
+        self.cull_dirty = True  # LOD截面与视口高度有关
 
     def update_camera_pose(self):
+        self.need_rerender = True
+        self._last_interaction = time.perf_counter()
         self.view_matrix = self.camera.get_view_matrix()
-        util.set_uniform_mat4(self.program, self.view_matrix, "view_matrix")
-        util.set_uniform_v3(self.program, self.camera.position, "cam_pos")
+        self.frame_uniforms.set("view_matrix", self.view_matrix)
+        self.frame_uniforms.set("cam_pos", self.camera.position)
+        self.sort_scheduler.mark_pose_dirty(self.view_matrix)
+        self.cull_dirty = True
         self.axes_helper.needs_update = True  # 每次更新相机姿态时，设置轴需要更新
 
     def update_camera_intrin(self):
+        self.need_rerender = True
+        self._last_interaction = time.perf_counter()
         self.proj_matrix = self.camera.get_project_matrix()
-        util.set_uniform_mat4(self.program, self.proj_matrix, "projection_matrix")
-        util.set_uniform_v3(self.program, self.camera.get_htanfovxy_focal(), "hfovxy_focal")
+        self.frame_uniforms.set("projection_matrix", self.proj_matrix)
+        self.frame_uniforms.set("hfovxy_focal", self.camera.get_htanfovxy_focal())
+        self.sort_scheduler.invalidate()  # 视锥改变，需要重新剔除
+        self.cull_dirty = True
         self.axes_helper.needs_update = True # 直接使用 AxesHelper 的更新标志
 
     # 包围盒
+    # 包围盒参数只在CPU上使用：改变后下一次绘制前重新生成包围盒内的高斯元列表并排序
+    def _set_boundary(self, key, value):
+        self.boundary[key] = value
+        self.boundary_dirty = True
+        self.need_rerender = True
+
     # Set the center point coordinates
     def set_points_center(self, points_center: list):
-        util.set_uniform_v3(self.program, points_center, "points_center")
+        self._set_boundary('points_center', np.array(points_center, dtype=np.float32))
 
     # Set whether to use a cube to limit the rendering area aabb
     def set_enable_aabb(self, enable_aabb: int):
-        util.set_uniform_1int(self.program, enable_aabb, "enable_aabb")
+        self._set_boundary('enable_aabb', int(enable_aabb))
 
     # Set whether to use a cube to limit the rendering area obb
     def set_enable_obb(self, enable_obb: int):
-        util.set_uniform_1int(self.program, enable_obb, "enable_obb")
+        self._set_boundary('enable_obb', int(enable_obb))
 
     # Set the rotation of the cube
     def set_cube_rotation(self, cube_rotation: list):
         R = util.convert_euler_angles_to_rotation_matrix(cube_rotation)
-        util.set_uniform_mat3(self.program, R, "cube_rotation") 
+        self._set_boundary('rotation', np.array(R, dtype=np.float32))
 
     # Set the minimum coordinates of the cube
     def set_point_cubeMin(self, point_cubeMin: list):
-        util.set_uniform_v3(self.program, point_cubeMin, "cubeMin")
+        self._set_boundary('cube_min', np.array(point_cubeMin, dtype=np.float32))
 
     # Set the maximum coordinates of the cube
     def set_point_cubeMax(self, point_cubeMax: list):
-        util.set_uniform_v3(self.program, point_cubeMax, "cubeMax")
+        self._set_boundary('cube_max', np.array(point_cubeMax, dtype=np.float32))
+
+    def _boundary_mask(self):
+        """渲染包围盒内的高斯元掩码，参数改变后才重新计算"""
+        if not self.boundary['enable_aabb'] and not self.boundary['enable_obb']:
+            return None
+        if self.boundary_mask is None or self.boundary_dirty:
+            if self.boundary_index is None:
+                self.boundary_index = BoundaryIndex(self.gaussians.xyz)
+            self.boundary_mask = self.boundary_index.mask(**self.boundary)
+            self.boundary_dirty = False
+        return self.boundary_mask
 
     def draw_boundary_box(self, points_center: list, point_cubeMin, point_cubeMax, cube_rotation):
+        # 界面每帧都会调用，参数没有变化时不需要重新设置
+        box_params = tuple(float(v) for v in (*points_center, *point_cubeMin, *point_cubeMax, *cube_rotation))
+        if box_params == self.box_params and self.ebo_box_triangles:
+            return
+        self.box_params = box_params
+        self.need_rerender = True
         R = util.convert_euler_angles_to_rotation_matrix(cube_rotation)
 
-        # 设置uniforms
-        util.set_uniform_mat4(self.program_boundary_box, self.view_matrix, "view_matrix")
-        util.set_uniform_mat4(self.program_boundary_box, self.proj_matrix, "projection_matrix")
-        util.set_uniform_mat3(self.program_boundary_box, R, "cube_rotation") 
-        util.set_uniform_v3(self.program_boundary_box, points_center, "points_center")
-        util.set_uniform_v3(self.program_boundary_box, point_cubeMin, "cubeMin")
-        util.set_uniform_v3(self.program_boundary_box, point_cubeMax, "cubeMax")
+        # 写入逐帧的uniform块，相机矩阵在绘制时已经是最新的
+        self.frame_uniforms.set("cube_rotation", R)
+        self.frame_uniforms.set("points_center", points_center)
+        self.frame_uniforms.set("cubeMin", point_cubeMin)
+        self.frame_uniforms.set("cubeMax", point_cubeMax)
 
         vertices, indices_triangles, indices_lines = util.create_box_mesh_from_bounds(points_center, point_cubeMin, point_cubeMax)
         rotated_vertices = np.dot(vertices, R.T) 
@@ -340,6 +1154,7 @@ class OpenGLRenderer(GaussianRenderBase):
         self.ebo_box_lines = util.set_faces_tovao(self.vao_box, indices_lines.flatten())
 
     def clear_boundary_box(self):
+        self.need_rerender = True
         # 清除包围盒的绘制资源
         if self.vbo_box:
             gl.glDeleteBuffers(1, [self.vbo_box])
@@ -355,24 +1170,135 @@ class OpenGLRenderer(GaussianRenderBase):
             self.vao_box = gl.glGenVertexArrays(1)  # 重新生成 VAO
         self.box_vertices_count_triangles = 0
         self.box_vertices_count_lines = 0
+        self.box_params = None
 
     def toggle_draw_boundary_box(self):
         # 切换包围盒显示状态
         self.switch_show_boundary_box = not self.switch_show_boundary_box
 
+    def _update_cov3d(self):
+        self.program_cov3d.use()
+        self.program_cov3d.set_1i("num_gaussians", len(self.gaussians))
+        gl.glDispatchCompute((len(self.gaussians) + 255) // 256, 1, 1)
+        gl.glMemoryBarrier(gl.GL_SHADER_STORAGE_BARRIER_BIT)
+        self.cov3d_dirty = False
+
+    def _ensure_frame_buffer(self, w, h):
+        if self.frame_size == (w, h):
+            return
+        if self.frame_fbo is None:
+            self.frame_fbo = gl.glGenFramebuffers(1)
+            self.frame_texture = gl.glGenTextures(1)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self.frame_texture)
+        gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA8, w, h, 0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, None)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.frame_fbo)
+        gl.glFramebufferTexture2D(gl.GL_FRAMEBUFFER, gl.GL_COLOR_ATTACHMENT0, gl.GL_TEXTURE_2D, self.frame_texture, 0)
+        self.frame_size = (w, h)
+
+    def _blit_frame(self, target_fbo):
+        # 把缓存的帧复制到目标帧缓冲（窗口或导出用的FBO），之后再绘制imgui
+        w, h = self.frame_size
+        tw, th = self.render_size
+        # 降低分辨率渲染时双线性放大
+        blit_filter = gl.GL_NEAREST if (w, h) == (tw, th) else gl.GL_LINEAR
+        gl.glBindFramebuffer(gl.GL_READ_FRAMEBUFFER, self.frame_fbo)
+        gl.glBindFramebuffer(gl.GL_DRAW_FRAMEBUFFER, target_fbo)
+        gl.glBlitFramebuffer(0, 0, w, h, 0, 0, tw, th, gl.GL_COLOR_BUFFER_BIT, blit_filter)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, target_fbo)
+
+    def _frame_resolution(self, now, target_fbo):
+        """按交互状态和帧时间选择离屏渲染的分辨率，高清导出等绘制到其他帧缓冲时始终使用原始分辨率"""
+        w, h = self.render_size
+        idle = now - self._last_interaction > self.restore_delay
+        mouse_pressed = self.camera.is_leftmouse_pressed or self.camera.is_rightmouse_pressed
+        if not self.dynamic_resolution or target_fbo != 0 or (idle and not mouse_pressed):
+            self.resolution_reduced = False
+        elif mouse_pressed or self.frame_time > self.target_frame_time:
+            # 降低后保持到相机静止，避免帧时间在目标附近时来回切换
+            self.resolution_reduced = True
+        if not self.resolution_reduced:
+            return w, h
+        return max(1, int(w * self.dynamic_scale)), max(1, int(h * self.dynamic_scale))
+
     def draw(self):
-        # 主渲染高斯
-        gl.glUseProgram(self.program)
-        gl.glBindVertexArray(self.vao)
-        num_gau = len(self.gaussians)
-        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER,self.ebo)
-        gl.glDrawElementsInstanced(gl.GL_TRIANGLES, len(self.quad_f.reshape(-1)), gl.GL_UNSIGNED_INT, None, num_gau)
+        self.poll_lod_build()
+        self.poll_sort_tuning()
+        # 包围盒改变后立即按新的高斯元列表排序，不依赖自动排序
+        if self.boundary_dirty and self.gaussians is not None:
+            self.sort_and_update()
+            self.boundary_dirty = False
+        # 关闭自动排序时不会重新排序，但可见集合仍随相机变化
+        if self.cull_dirty and self.gaussians is not None:
+            self.recull()
+        now = time.perf_counter()
+        target_fbo = int(gl.glGetIntegerv(gl.GL_DRAW_FRAMEBUFFER_BINDING))
+        frame_size = self._frame_resolution(now, target_fbo)
+        # 不通过setter修改的状态：背景色、坐标轴和包围盒的显示开关
+        clear_color = tuple(float(c) for c in gl.glGetFloatv(gl.GL_COLOR_CLEAR_VALUE))
+        frame_key = (clear_color, self.show_axes, self.switch_show_boundary_box, self.render_size, frame_size)
+        if self.reduce_updates and not self.need_rerender and frame_key == self.frame_key:
+            self._blit_frame(target_fbo)
+            self._last_frame_start = None
+            return
+        self.need_rerender = False
+        self.frame_key = frame_key
+        # 连续渲染的帧之间的时间，复用缓存帧之后的第一帧不计入
+        if self._last_frame_start is not None:
+            self.frame_time += 0.2 * (now - self._last_frame_start - self.frame_time)
+        self._last_frame_start = now
+
+        self._ensure_frame_buffer(*frame_size)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.frame_fbo)
+        gl.glViewport(0, 0, *frame_size)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        self._draw_scene()
+        gl.glViewport(0, 0, *self.render_size)
+        self._blit_frame(target_fbo)
+
+    def _draw_scene(self):
+        self.frame_uniforms.upload()
+        if self.cov3d_dirty and self.gaussians is not None:
+            self._update_cov3d()
+        num_gau = self.num_instances  # 视锥剔除后剩余的高斯元数量
+        if num_gau > 0:
+            # 重置间接绘制命令的实例数，由预处理累加可见数量
+            gl.glBindBuffer(gl.GL_DRAW_INDIRECT_BUFFER, self.draw_command_bufferid)
+            gl.glBufferSubData(gl.GL_DRAW_INDIRECT_BUFFER, 0, self.draw_command.nbytes, self.draw_command)
+            num_groups = (num_gau + 255) // 256
+            # 预处理：每个高斯元计算一次，按绘制顺序写入splat_data，并剔除不产生片段的高斯元
+            self.program_preprocess.use()
+            self.program_preprocess.set_1i("num_instances", num_gau)
+            self.program_preprocess.set_2f("viewport_size", self.frame_size)
+            gl.glDispatchCompute(num_groups, 1, 1)
+            gl.glMemoryBarrier(gl.GL_SHADER_STORAGE_BARRIER_BIT)
+            # 各工作组在绘制列表中的起始位置
+            self.program_scan.use()
+            self.program_scan.set_1i("num_groups", num_groups)
+            gl.glDispatchCompute(1, 1, 1)
+            gl.glMemoryBarrier(gl.GL_SHADER_STORAGE_BARRIER_BIT)
+            # 按绘制顺序压缩可见的高斯元
+            self.program_compact.use()
+            self.program_compact.set_1i("num_instances", num_gau)
+            gl.glDispatchCompute(num_groups, 1, 1)
+            gl.glMemoryBarrier(gl.GL_SHADER_STORAGE_BARRIER_BIT | gl.GL_COMMAND_BARRIER_BIT)
+
+            # 主渲染高斯，实例数在GPU上确定，不读回CPU
+            self.program.use()
+            gl.glBindVertexArray(self.vao)
+            gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER,self.ebo)
+            gl.glDrawElementsIndirect(gl.GL_TRIANGLES, gl.GL_UNSIGNED_INT, None)
+            gl.glBindBuffer(gl.GL_DRAW_INDIRECT_BUFFER, 0)
+        # 之后写入该排序索引槽位前需等待本帧读取完成
+        self.index_buffer.fence()
 
         # 绘制包围盒
         if self.switch_show_boundary_box:
             if self.vao_box and self.ebo_box_triangles and self.ebo_box_lines:
                 # 绑定着色器程序
-                gl.glUseProgram(self.program_boundary_box)
+                self.program_boundary_box.use()
                 gl.glBindVertexArray(self.vao_box)
                 # 使用填充模式绘制面
                 gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, self.ebo_box_triangles)
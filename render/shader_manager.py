@@ -0,0 +1,158 @@
+from OpenGL import GL as gl
+import OpenGL.GL.shaders as shaders
+import ctypes
+import hashlib
+import os
+import struct
+
+from .shader_program import ShaderProgram
+
+# 链接后的程序二进制按驱动、源码和宏定义缓存，下次启动时跳过GLSL编译
+_SHADER_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".gsviewer", "shader_cache")
+
+# 按文件名后缀判断着色器阶段，与shaders目录的命名一致
+_STAGES = (
+    ('_vert.glsl', gl.GL_VERTEX_SHADER),
+    ('_frag.glsl', gl.GL_FRAGMENT_SHADER),
+    ('_comp.glsl', gl.GL_COMPUTE_SHADER),
+)
+
+
+def _shader_stage(path):
+    for suffix, stage in _STAGES:
+        if path.endswith(suffix):
+            return stage
+    raise ValueError(f"Unknown shader stage: {path}")
+
+
+class ShaderManager:
+    """
+    着色器程序管理：相同的源文件和宏定义只创建一个程序（如坐标轴的着色器），
+    链接结果通过glGetProgramBinary缓存到磁盘，驱动不支持或缓存失效时从源码编译。
+    """
+
+    def __init__(self, cache_dir=_SHADER_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.programs = {}
+        self._driver = None
+
+    def driver_key(self):
+        """驱动更新后缓存的二进制不再可用，键中包含厂商、渲染器和版本字符串"""
+        if self._driver is None:
+            parts = []
+            for name in (gl.GL_VENDOR, gl.GL_RENDERER, gl.GL_VERSION):
+                value = gl.glGetString(name)
+                parts.append(value.decode(errors='replace') if value else "unknown")
+            self._driver = "|".join(parts)
+        return self._driver
+
+    @staticmethod
+    def _read_source(path, defines):
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        if not defines:
+            return source
+        # 宏定义插入在#version之后
+        lines = source.split('\n')
+        insert_at = next((i + 1 for i, line in enumerate(lines) if line.strip().startswith('#version')), 0)
+        lines[insert_at:insert_at] = [f"#define {name} {value}" for name, value in sorted(defines.items())]
+        return '\n'.join(lines)
+
+    def get(self, *paths, defines=None) -> ShaderProgram:
+        """返回由给定着色器文件链接的程序，多次请求同一组文件时返回同一个程序"""
+        defines = dict(defines or {})
+        key = (paths, tuple(sorted(defines.items())))
+        program = self.programs.get(key)
+        if program is not None:
+            return program
+        sources = [(_shader_stage(path), self._read_source(path, defines)) for path in paths]
+        digest = hashlib.sha1(self.driver_key().encode())
+        for stage, source in sources:
+            digest.update(struct.pack('<I', stage))
+            digest.update(source.encode())
+        cache_path = os.path.join(self.cache_dir, digest.hexdigest() + ".bin")
+        program_id = self._load_binary(cache_path)
+        if program_id is None:
+            program_id = self._compile(sources)
+            self._save_binary(program_id, cache_path)
+        program = self.programs[key] = ShaderProgram(program_id)
+        return program
+
+    @staticmethod
+    def binary_supported():
+        return gl.glGetIntegerv(gl.GL_NUM_PROGRAM_BINARY_FORMATS) > 0
+
+    def _load_binary(self, cache_path):
+        if not self.binary_supported():
+            return None
+        try:
+            with open(cache_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) <= 4:
+            return None
+        binary_format, = struct.unpack('<I', data[:4])
+        binary = data[4:]
+        program_id = gl.glCreateProgram()
+        # 驱动拒绝二进制时报错或链接状态为失败，回退到从源码编译
+        try:
+            gl.glProgramBinary(program_id, binary_format, binary, len(binary))
+            linked = gl.glGetProgramiv(program_id, gl.GL_LINK_STATUS) == gl.GL_TRUE
+        except gl.GLError:
+            linked = False
+        if not linked:
+            gl.glDeleteProgram(program_id)
+            return None
+        return program_id
+
+    @staticmethod
+    def _compile(sources):
+        shader_ids = [shaders.compileShader(source, stage) for stage, source in sources]
+        program_id = gl.glCreateProgram()
+        gl.glProgramParameteri(program_id, gl.GL_PROGRAM_BINARY_RETRIEVABLE_HINT, gl.GL_TRUE)
+        for shader_id in shader_ids:
+            gl.glAttachShader(program_id, shader_id)
+        gl.glLinkProgram(program_id)
+        for shader_id in shader_ids:
+            gl.glDetachShader(program_id, shader_id)
+            gl.glDeleteShader(shader_id)
+        if gl.glGetProgramiv(program_id, gl.GL_LINK_STATUS) != gl.GL_TRUE:
+            log = gl.glGetProgramInfoLog(program_id)
+            gl.glDeleteProgram(program_id)
+            raise RuntimeError(f"Link failure: {log}")
+        return program_id
+
+    def _save_binary(self, program_id, cache_path):
+        if not self.binary_supported():
+            return
+        length = int(gl.glGetProgramiv(program_id, gl.GL_PROGRAM_BINARY_LENGTH))
+        if length <= 0:
+            return
+        binary = (ctypes.c_ubyte * length)()
+        written = gl.GLsizei(0)
+        binary_format = gl.GLenum(0)
+        gl.glGetProgramBinary(program_id, length, ctypes.byref(written), ctypes.byref(binary_format), binary)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cache_path, 'wb') as f:
+                f.write(struct.pack('<I', binary_format.value))
+                f.write(bytes(binary)[:written.value])
+        except OSError as e:
+            print(f"Failed to save shader cache: {e}")
+
+    def delete(self):
+        for program in self.programs.values():
+            program.delete()
+        self.programs.clear()
+
+
+_shader_manager = None
+
+
+def get_shader_manager() -> ShaderManager:
+    """当前OpenGL上下文共用的着色器管理器"""
+    global _shader_manager
+    if _shader_manager is None:
+        _shader_manager = ShaderManager()
+    return _shader_manager
@@ -0,0 +1,145 @@
+from OpenGL import GL as gl
+import numpy as np
+import glm
+
+
+def _matrix_columns(content, size):
+    """与util.set_uniform_mat*相同的约定：numpy矩阵转置后按列主序上传，glm矩阵直接上传"""
+    if isinstance(content, (glm.mat3, glm.mat4)):
+        return np.array(content, dtype=np.float32).reshape(size, size)
+    return np.asarray(content, dtype=np.float32).reshape(size, size).T
+
+
+class ShaderProgram:
+    """
+    着色器程序的封装：uniform位置只查询一次，值没有变化时不重复上传。
+    使用glProgramUniform*直接写入程序，不需要先glUseProgram。
+    """
+
+    def __init__(self, program):
+        self.id = program
+        self._locations = {}
+        self._values = {}
+
+    def use(self):
+        gl.glUseProgram(self.id)
+
+    def location(self, name):
+        location = self._locations.get(name)
+        if location is None:
+            location = self._locations[name] = gl.glGetUniformLocation(self.id, name)
+        return location
+
+    def _changed(self, name, value):
+        """记录新值，返回是否需要上传"""
+        if self._values.get(name) == value:
+            return False
+        self._values[name] = value
+        return self.location(name) != -1
+
+    def set_1i(self, name, value):
+        value = int(value)
+        if self._changed(name, value):
+            gl.glProgramUniform1i(self.id, self.location(name), value)
+
+    def set_1f(self, name, value):
+        value = float(value)
+        if self._changed(name, value):
+            gl.glProgramUniform1f(self.id, self.location(name), value)
+
+    def set_2f(self, name, value):
+        value = tuple(float(v) for v in value[:2])
+        if self._changed(name, value):
+            gl.glProgramUniform2f(self.id, self.location(name), *value)
+
+    def set_3f(self, name, value):
+        value = tuple(float(v) for v in value[:3])
+        if self._changed(name, value):
+            gl.glProgramUniform3f(self.id, self.location(name), *value)
+
+    def set_4f(self, name, x, y, z, w):
+        value = (float(x), float(y), float(z), float(w))
+        if self._changed(name, value):
+            gl.glProgramUniform4f(self.id, self.location(name), *value)
+
+    def set_mat3(self, name, content):
+        columns = _matrix_columns(content, 3)
+        if self._changed(name, columns.tobytes()):
+            gl.glProgramUniformMatrix3fv(self.id, self.location(name), 1, gl.GL_FALSE, columns)
+
+    def set_mat4(self, name, content):
+        columns = _matrix_columns(content, 4)
+        if self._changed(name, columns.tobytes()):
+            gl.glProgramUniformMatrix4fv(self.id, self.location(name), 1, gl.GL_FALSE, columns)
+
+    def delete(self):
+        gl.glDeleteProgram(self.id)
+
+
+# std140布局中各类型的（对齐, 大小），单位为字节
+_STD140 = {
+    'int': (4, 4),
+    'float': (4, 4),
+    'vec3': (16, 12),
+    'vec4': (16, 16),
+    'mat3': (16, 48),  # 3列，每列按vec4对齐
+    'mat4': (16, 64),
+}
+
+
+class UniformBuffer:
+    """
+    std140布局的uniform块。各字段先写入CPU端的副本，只有内容变化时才标记为脏，
+    每帧绘制前调用一次upload()整体上传。fields的顺序必须与着色器中块的声明一致。
+    """
+
+    def __init__(self, fields, binding):
+        self.binding = binding
+        self.types = dict(fields)
+        self.offsets = {}
+        offset = 0
+        for name, glsl_type in fields:
+            align, size = _STD140[glsl_type]
+            offset = (offset + align - 1) // align * align
+            self.offsets[name] = offset
+            offset += size
+        size = (offset + 15) // 16 * 16
+        self.data = np.zeros(size // 4, dtype=np.float32)
+        self.buffer_id = gl.glGenBuffers(1)
+        gl.glBindBuffer(gl.GL_UNIFORM_BUFFER, self.buffer_id)
+        gl.glBufferData(gl.GL_UNIFORM_BUFFER, self.data.nbytes, None, gl.GL_DYNAMIC_DRAW)
+        gl.glBindBuffer(gl.GL_UNIFORM_BUFFER, 0)
+        gl.glBindBufferBase(gl.GL_UNIFORM_BUFFER, binding, self.buffer_id)
+        self.dirty = True
+
+    def set(self, name, value):
+        glsl_type = self.types[name]
+        if glsl_type == 'int':
+            packed = np.array([value], dtype=np.int32).view(np.float32)
+        elif glsl_type == 'mat3':
+            packed = np.zeros((3, 4), dtype=np.float32)
+            packed[:, :3] = _matrix_columns(value, 3)
+        elif glsl_type == 'mat4':
+            packed = _matrix_columns(value, 4)
+        else:
+            packed = np.asarray(value, dtype=np.float32)
+        packed = packed.reshape(-1)
+        start = self.offsets[name] // 4
+        target = self.data[start:start + len(packed)]
+        if not np.array_equal(target, packed):
+            target[:] = packed
+            self.dirty = True
+
+    def upload(self):
+        if not self.dirty:
+            return
+        gl.glBindBuffer(gl.GL_UNIFORM_BUFFER, self.buffer_id)
+        gl.glBufferSubData(gl.GL_UNIFORM_BUFFER, 0, self.data.nbytes, self.data)
+        gl.glBindBuffer(gl.GL_UNIFORM_BUFFER, 0)
+        gl.glBindBufferBase(gl.GL_UNIFORM_BUFFER, self.binding, self.buffer_id)
+        self.dirty = False
+
+    def delete(self):
+        if self.buffer_id is not None:
+            gl.glDeleteBuffers(1, [self.buffer_id])
+            self.buffer_id = None
@@ -0,0 +1,147 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+def icosphere_directions(subdivisions: int = 1) -> np.ndarray:
+    """细分二十面体的顶点方向（单位向量），0次细分12个，1次42个，2次162个"""
+    t = (1.0 + np.sqrt(5.0)) / 2.0
+    vertices = [
+        (-1, t, 0), (1, t, 0), (-1, -t, 0), (1, -t, 0),
+        (0, -1, t), (0, 1, t), (0, -1, -t), (0, 1, -t),
+        (t, 0, -1), (t, 0, 1), (-t, 0, -1), (-t, 0, 1),
+    ]
+    faces = [
+        (0, 11, 5), (0, 5, 1), (0, 1, 7), (0, 7, 10), (0, 10, 11),
+        (1, 5, 9), (5, 11, 4), (11, 10, 2), (10, 7, 6), (7, 1, 8),
+        (3, 9, 4), (3, 4, 2), (3, 2, 6), (3, 6, 8), (3, 8, 9),
+        (4, 9, 5), (2, 4, 11), (6, 2, 10), (8, 6, 7), (9, 8, 1),
+    ]
+    vertices = [np.array(v, dtype=np.float64) / np.linalg.norm(v) for v in vertices]
+    for _ in range(subdivisions):
+        midpoints = {}
+        def midpoint(a, b):
+            key = (min(a, b), max(a, b))
+            if key not in midpoints:
+                m = vertices[a] + vertices[b]
+                vertices.append(m / np.linalg.norm(m))
+                midpoints[key] = len(vertices) - 1
+            return midpoints[key]
+        new_faces = []
+        for a, b, c in faces:
+            ab, bc, ca = midpoint(a, b), midpoint(b, c), midpoint(c, a)
+            new_faces += [(a, ab, ca), (b, bc, ab), (c, ca, bc), (ab, bc, ca)]
+        faces = new_faces
+    return np.array(vertices)
+
+
+class SortAtlas:
+    """
+    预计算的排序图集：在后台线程中对一组固定视线方向（细分二十面体）预先排序。
+    运行时视线方向与最近的预计算方向夹角不超过max_angle时直接使用其排序，不再完整排序。
+    相反方向的排序互为逆序，只保存半个球面上的方向。
+    """
+
+    def __init__(self, gaus, subdivisions: int = 1, max_angle: float = 5.0):
+        """
+        Args:
+            gaus: 高斯数据，使用其xyz
+            subdivisions: 二十面体细分次数，决定方向数量（内存为 方向数/2 * 高斯元数 * 4字节）
+            max_angle: 使用预计算排序的最大夹角，单位为度
+        """
+        self.gaus = gaus
+        self.subdivisions = subdivisions
+        self.max_angle = max_angle
+        directions = icosphere_directions(subdivisions)
+        # 每对相反方向保留一个：z > 0，或z = 0时y > 0，或y = z = 0时x > 0
+        eps = 1e-9
+        x, y, z = directions.T
+        keep = (z > eps) | ((np.abs(z) <= eps) & ((y > eps) | ((np.abs(y) <= eps) & (x > 0))))
+        self.directions = directions[keep].astype(np.float32)
+        self.orders = [None] * len(self.directions)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def num_done(self):
+        return sum(order is not None for order in self.orders)
+
+    @property
+    def ready(self):
+        return self.num_done == len(self.orders)
+
+    @staticmethod
+    def fingerprint(xyz) -> str:
+        xyz = np.ascontiguousarray(xyz, dtype=np.float32)
+        return f"{len(xyz)}-{hashlib.sha1(xyz.tobytes()).hexdigest()}"
+
+    @staticmethod
+    def cache_path(gaus):
+        """缓存文件放在PLY文件旁边"""
+        if not gaus.path:
+            return None
+        return os.path.splitext(gaus.path)[0] + ".sortatlas.npz"
+
+    def _sort_direction(self, i, xyz):
+        order = np.argsort(xyz @ self.directions[i]).astype(np.int32)
+        with self._lock:
+            self.orders[i] = order
+
+    def build_async(self, num_threads=None, cache_path=None):
+        """在后台线程中计算所有方向的排序，完成后写入缓存文件（可选）"""
+        if self._thread is not None:
+            return
+        xyz = np.ascontiguousarray(self.gaus.xyz, dtype=np.float32)
+        todo = [i for i, order in enumerate(self.orders) if order is None]
+
+        def build():
+            with ThreadPoolExecutor(max_workers=num_threads or os.cpu_count() or 1) as pool:
+                list(pool.map(lambda i: self._sort_direction(i, xyz), todo))
+            if cache_path is not None:
+                try:
+                    self.save(cache_path)
+                except OSError as e:
+                    print(f"Failed to save sort atlas to {cache_path}: {e}")
+
+        self._thread = threading.Thread(target=build, name="gs_sort_atlas", daemon=True)
+        self._thread.start()
+
+    def lookup(self, view_matrix):
+        """返回最近的已计算方向的排序（Nx1 int32），夹角超过max_angle时返回None"""
+        view_dir = np.asarray(view_matrix, dtype=np.float32)[2, :3]
+        view_dir = view_dir / np.linalg.norm(view_dir)
+        with self._lock:
+            built = np.array([order is not None for order in self.orders])
+        if not built.any():
+            return None
+        cos_angles = self.directions @ view_dir
+        cos_angles[~built] = 0.0
+        i = int(np.argmax(np.abs(cos_angles)))
+        if np.degrees(np.arccos(min(abs(float(cos_angles[i])), 1.0))) > self.max_angle:
+            return None
+        # 深度按视图矩阵z行升序，相反方向的排序为逆序
+        order = self.orders[i] if cos_angles[i] > 0 else self.orders[i][::-1]
+        return order.reshape(-1, 1)
+
+    def save(self, path):
+        with self._lock:
+            orders = np.stack(self.orders)
+        np.savez(path, fingerprint=self.fingerprint(self.gaus.xyz), subdivisions=self.subdivisions,
+                 directions=self.directions, orders=orders)
+        print(f"Sort atlas saved to {path}")
+
+    @classmethod
+    def load(cls, path, gaus, max_angle: float = 5.0):
+        """读取缓存，文件不存在或与当前数据不匹配时返回None"""
+        if path is None or not os.path.exists(path):
+            return None
+        with np.load(path) as cache:
+            if str(cache['fingerprint']) != cls.fingerprint(gaus.xyz):
+                return None
+            atlas = cls(gaus, int(cache['subdivisions']), max_angle)
+            if not np.allclose(atlas.directions, cache['directions']):
+                return None
+            atlas.orders = list(cache['orders'])
+        return atlas
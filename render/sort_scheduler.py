@@ -0,0 +1,120 @@
+import time
+from collections import deque
+import numpy as np
+from scipy.spatial.transform import Rotation
+
+
+class SortScheduler:
+    """
+    排序调度器：只有相机姿态发生变化（Camera.is_pose_dirty）时才检查是否需要重新排序，
+    视线方向或相机位置相对上一次排序的变化超过容差时才排序。
+    正射投影下深度顺序与相机位置无关，纯平移不会触发排序（开启视锥剔除时除外，平移会改变可见集合）。
+
+    异步排序的结果要在一个排序延迟之后才被使用，predict_view_matrix根据最近几次相机姿态
+    估计角速度和线速度，外推到一个排序延迟之后，使排序结果在被使用时与实际姿态更接近。
+    """
+
+    def __init__(self, angle_tolerance: float = 0.5, distance_tolerance: float = 0.05):
+        """
+        Args:
+            angle_tolerance: 视线方向变化的容差，单位为度
+            distance_tolerance: 相机位置变化的容差，相对于相机到目标点的距离
+        """
+        self.angle_tolerance = angle_tolerance
+        self.distance_tolerance = distance_tolerance
+        self.sorts_done = 0
+        self.sorts_skipped = 0
+        self._pose_dirty = True
+        self._sorted_view_dir = None
+        self._sorted_position = None
+
+        self.predictive = True
+        self.sort_latency = 0.0  # 排序延迟（秒），指数滑动平均
+        self.max_lead_time = 0.25  # 外推时间的上限，避免延迟突增时过度外推
+        self.idle_time = 0.1  # 超过该时间没有新姿态视为相机已静止，不外推
+        self._pose_history = deque(maxlen=4)  # (时间, 视图矩阵)
+        self._settle_pending = False  # 上一次排序使用了外推姿态，相机静止后需按实际姿态再排序一次
+
+    def mark_pose_dirty(self, view_matrix=None):
+        """相机姿态更新后调用，传入视图矩阵时记录到姿态历史中用于估计相机速度"""
+        self._pose_dirty = True
+        if view_matrix is not None:
+            self._pose_history.append((time.perf_counter(), np.array(view_matrix, dtype=np.float64)))
+
+    def update_latency(self, latency: float, smoothing: float = 0.3):
+        """记录一次从提交排序到开始使用排序结果的时间"""
+        if self.sort_latency == 0.0:
+            self.sort_latency = latency
+        else:
+            self.sort_latency += smoothing * (latency - self.sort_latency)
+
+    def predict_view_matrix(self, view_matrix):
+        """
+        返回外推一个排序延迟之后的视图矩阵。相机静止、姿态历史不足或关闭预测时返回原矩阵。
+        旋转按姿态历史首尾之间的平均角速度外推，位置按平均线速度外推。
+        """
+        if not self.predictive or self.sort_latency <= 0.0 or len(self._pose_history) < 2:
+            return view_matrix
+        t0, view0 = self._pose_history[0]
+        t1, view1 = self._pose_history[-1]
+        dt = t1 - t0
+        if dt <= 1e-6 or time.perf_counter() - t1 > self.idle_time:
+            return view_matrix
+        lead = min(self.sort_latency, self.max_lead_time)
+        view_matrix = np.asarray(view_matrix, dtype=np.float64)
+
+        rotation0, rotation1 = view0[:3, :3], view1[:3, :3]
+        # 视图空间中的相对旋转 R1 * R0^T，按角速度外推后作用到当前旋转上
+        rotvec = Rotation.from_matrix(rotation1 @ rotation0.T).as_rotvec()
+        rotation = Rotation.from_rotvec(rotvec * (lead / dt)).as_matrix() @ view_matrix[:3, :3]
+        _, position0 = self._view_dir_and_position(view0)
+        _, position1 = self._view_dir_and_position(view1)
+        _, position = self._view_dir_and_position(view_matrix)
+        position = position + (position1 - position0) * (lead / dt)
+
+        predicted = np.eye(4)
+        predicted[:3, :3] = rotation
+        predicted[:3, 3] = -rotation @ position
+        return predicted
+
+    def invalidate(self):
+        """高斯数据改变后调用，下一次检查时强制排序"""
+        self._pose_dirty = True
+        self._sorted_view_dir = None
+
+    @staticmethod
+    def _view_dir_and_position(view_matrix):
+        view_matrix = np.asarray(view_matrix, dtype=np.float64)
+        rotation = view_matrix[:3, :3]
+        position = -rotation.T @ view_matrix[:3, 3]
+        return rotation[2], position
+
+    def should_sort(self, view_matrix, camera, culling: bool = False) -> bool:
+        if not self._pose_dirty:
+            if self._settle_pending and time.perf_counter() - self._pose_history[-1][0] > self.idle_time:
+                self._settle_pending = False
+                return True
+            self.sorts_skipped += 1
+            return False
+        self._pose_dirty = False
+        if self._sorted_view_dir is None:
+            return True
+
+        view_dir, position = self._view_dir_and_position(view_matrix)
+        cos_angle = np.clip(np.dot(view_dir, self._sorted_view_dir), -1.0, 1.0)
+        if np.degrees(np.arccos(cos_angle)) > self.angle_tolerance:
+            return True
+        if culling or not camera.use_orthographic:
+            distance = np.linalg.norm(position - self._sorted_position)
+            if distance > self.distance_tolerance * max(camera.target_dist, 1e-6):
+                return True
+
+        # 变化在容差内：保留上一次排序时的姿态作为基准，缓慢移动的累计变化仍会触发排序
+        self.sorts_skipped += 1
+        return False
+
+    def mark_sorted(self, view_matrix, predicted: bool = False):
+        """记录本次排序时的实际相机姿态，predicted表示排序使用的是外推姿态"""
+        self._sorted_view_dir, self._sorted_position = self._view_dir_and_position(view_matrix)
+        self._settle_pending = predicted
+        self.sorts_done += 1
@@ -0,0 +1,95 @@
+import ctypes
+from OpenGL import GL as gl
+import numpy as np
+
+
+class StreamingStorageBuffer:
+    """
+    频繁更新的SSBO（如排序索引），使用多个槽位轮流写入，正在被绘制命令读取的槽位不会被覆盖。
+    OpenGL 4.4以上用glBufferStorage分配一次并持久一致映射，CPU直接写入映射内存，
+    写入前等待该槽位上一次使用的栅栏；否则用glBufferSubData更新，只在容量不足时重新分配。
+    """
+
+    def __init__(self, num_slots: int = 2):
+        self.persistent = self.is_persistent_supported()
+        self.num_slots = num_slots
+        self.buffer_ids = [None] * num_slots
+        self.pointers = [None] * num_slots
+        self.fences = [None] * num_slots
+        self.capacity = 0
+        self.front = 0  # 最近一次写入的槽位
+
+    @staticmethod
+    def is_persistent_supported():
+        major = gl.glGetIntegerv(gl.GL_MAJOR_VERSION)
+        minor = gl.glGetIntegerv(gl.GL_MINOR_VERSION)
+        return (major, minor) >= (4, 4)
+
+    def _allocate(self, nbytes):
+        self.delete()
+        self.buffer_ids = list(np.atleast_1d(gl.glGenBuffers(self.num_slots)))
+        for slot, buffer_id in enumerate(self.buffer_ids):
+            gl.glBindBuffer(gl.GL_SHADER_STORAGE_BUFFER, buffer_id)
+            if self.persistent:
+                flags = gl.GL_MAP_WRITE_BIT | gl.GL_MAP_PERSISTENT_BIT | gl.GL_MAP_COHERENT_BIT
+                gl.glBufferStorage(gl.GL_SHADER_STORAGE_BUFFER, nbytes, None, flags)
+                self.pointers[slot] = gl.glMapBufferRange(gl.GL_SHADER_STORAGE_BUFFER, 0, nbytes, flags)
+            else:
+                gl.glBufferData(gl.GL_SHADER_STORAGE_BUFFER, nbytes, None, gl.GL_DYNAMIC_DRAW)
+        gl.glBindBuffer(gl.GL_SHADER_STORAGE_BUFFER, 0)
+        self.capacity = nbytes
+
+    def _wait(self, slot):
+        fence = self.fences[slot]
+        if fence is None:
+            return
+        # GPU完成读取该槽位的命令之前不能覆盖，一般在上一帧就已完成
+        while gl.glClientWaitSync(fence, gl.GL_SYNC_FLUSH_COMMANDS_BIT, 1000000000) == gl.GL_TIMEOUT_EXPIRED:
+            pass
+        gl.glDeleteSync(fence)
+        self.fences[slot] = None
+
+    def write(self, data: np.ndarray, bind_idx: int):
+        """写入下一个槽位并绑定到bind_idx"""
+        data = np.ascontiguousarray(data)
+        if data.nbytes > self.capacity:
+            self._allocate(data.nbytes)
+        slot = (self.front + 1) % self.num_slots
+        self._wait(slot)
+        if self.persistent:
+            ctypes.memmove(self.pointers[slot], data.ctypes.data, data.nbytes)
+        else:
+            gl.glBindBuffer(gl.GL_SHADER_STORAGE_BUFFER, self.buffer_ids[slot])
+            gl.glBufferSubData(gl.GL_SHADER_STORAGE_BUFFER, 0, data.nbytes, data)
+            gl.glBindBuffer(gl.GL_SHADER_STORAGE_BUFFER, 0)
+        gl.glBindBufferBase(gl.GL_SHADER_STORAGE_BUFFER, bind_idx, self.buffer_ids[slot])
+        self.front = slot
+
+    def bind(self, bind_idx: int):
+        """重新绑定最近一次写入的槽位，用于其他缓冲区临时占用了同一个binding之后"""
+        if self.buffer_ids[self.front] is not None:
+            gl.glBindBufferBase(gl.GL_SHADER_STORAGE_BUFFER, bind_idx, self.buffer_ids[self.front])
+
+    def fence(self):
+        """在读取当前槽位的绘制命令之后调用"""
+        if self.buffer_ids[self.front] is None:
+            return
+        if self.fences[self.front] is not None:
+            gl.glDeleteSync(self.fences[self.front])
+        self.fences[self.front] = gl.glFenceSync(gl.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+
+    def delete(self):
+        for slot, buffer_id in enumerate(self.buffer_ids):
+            if buffer_id is None:
+                continue
+            if self.fences[slot] is not None:
+                gl.glDeleteSync(self.fences[slot])
+                self.fences[slot] = None
+            if self.pointers[slot] is not None:
+                gl.glBindBuffer(gl.GL_SHADER_STORAGE_BUFFER, buffer_id)
+                gl.glUnmapBuffer(gl.GL_SHADER_STORAGE_BUFFER)
+                self.pointers[slot] = None
+            gl.glDeleteBuffers(1, [buffer_id])
+            self.buffer_ids[slot] = None
+        gl.glBindBuffer(gl.GL_SHADER_STORAGE_BUFFER, 0)
+        self.capacity = 0
@@ -1,12 +1,22 @@
 #version 430 core
 // layout (location = 0) in vec3 vertexPosition;
 
-uniform mat4 view_matrix;
-uniform mat4 projection_matrix;
-uniform vec3 points_center;
-uniform mat3 cube_rotation;
-uniform vec3 cubeMin; 
-uniform vec3 cubeMax; 
+// 与gau_preprocess_comp.glsl共用的逐帧状态
+layout (std140, binding=0) uniform frame_data {
+	mat4 view_matrix;
+	mat4 projection_matrix;
+	vec3 hfovxy_focal;
+	float screen_display_scale_factor;
+	vec3 cam_pos;
+	float dc_factor;
+	vec3 color_scale_factors;
+	float extra_factor;
+	vec3 light_rotation;
+	vec3 points_center;
+	vec3 cubeMin;
+	vec3 cubeMax;
+	mat3 cube_rotation;
+};
 
 void main()
 {
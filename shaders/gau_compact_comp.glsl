@@ -0,0 +1,51 @@
+#version 430 core
+
+// 按绘制顺序压缩可见的高斯元：工作组内对可见标记求前缀和，
+// 加上gau_scan_comp.glsl算出的工作组起始位置，写入visible_order
+// 工作组大小与gau_preprocess_comp.glsl一致
+
+#define LOCAL_SIZE 256
+
+layout(local_size_x = LOCAL_SIZE) in;
+
+// 与gau_preprocess_comp.glsl中的定义一致
+struct Splat {
+	vec4 center;  // xyz: NDC坐标，w: 1可见，0被剔除
+	vec4 extent;
+	vec4 conic_alpha;
+	vec4 color;
+};
+layout (std430, binding=3) buffer splat_data {
+	Splat splats[];
+};
+layout (std430, binding=5) buffer visible_data {
+	int visible_order[];  // 压缩后的绘制列表，元素为splat_data中的位置
+};
+layout (std430, binding=7) buffer group_data {
+	uint group_offsets[];
+};
+
+uniform int num_instances;
+
+shared uint offsets[LOCAL_SIZE];
+
+void main()
+{
+	uint tid = gl_LocalInvocationIndex;
+	int instance = int(gl_GlobalInvocationID.x);
+	uint visible = (instance < num_instances && splats[instance].center.w != 0.f) ? 1u : 0u;
+	offsets[tid] = visible;
+	barrier();
+
+	// Hillis-Steele包含前缀和，保持工作组内的先后顺序
+	for (uint offset = 1; offset < LOCAL_SIZE; offset <<= 1)
+	{
+		uint value = tid >= offset ? offsets[tid - offset] : 0;
+		barrier();
+		offsets[tid] += value;
+		barrier();
+	}
+
+	if (visible != 0)
+		visible_order[group_offsets[gl_WorkGroupID.x] + offsets[tid] - 1] = instance;
+}
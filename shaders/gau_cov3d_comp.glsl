@@ -0,0 +1,74 @@
+#version 430 core
+
+// 预计算每个高斯元的3D协方差（对称矩阵的6个分量），只在数据加载、
+// gaussian_scale_factor或rot_modifier改变时运行，逐帧的预处理直接读取
+
+layout(local_size_x = 256) in;
+
+#define ROT_IDX 3
+#define SCALE_IDX 7
+
+layout (std430, binding=0) buffer gaussian_data {
+	float g_data[];
+};
+layout (std430, binding=4) buffer cov3d_data {
+	float g_cov3d[];  // 每个高斯元: xx, xy, xz, yy, yz, zz
+};
+
+uniform int sh_dim;
+uniform int num_gaussians;
+uniform float gaussian_scale_factor; // 高斯核的缩放因子，用于调整高斯核的大小，3D空间中的物理尺寸
+uniform vec4 rot_modifier; // 旋转因子四元数
+
+mat3 computeCov3D(vec3 scale, vec4 q)  // should be correct
+{
+    mat3 S = mat3(0.f);
+    S[0][0] = scale.x;
+	S[1][1] = scale.y;
+	S[2][2] = scale.z;
+	float r = q.x;
+	float x = q.y;
+	float y = q.z;
+	float z = q.w;
+
+    mat3 R = mat3(
+		1.f - 2.f * (y * y + z * z), 2.f * (x * y - r * z), 2.f * (x * z + r * y),
+		2.f * (x * y + r * z), 1.f - 2.f * (x * x + z * z), 2.f * (y * z - r * x),
+		2.f * (x * z - r * y), 2.f * (y * z + r * x), 1.f - 2.f * (x * x + y * y)
+	);
+
+    mat3 M = S * R;
+    mat3 Sigma = transpose(M) * M;
+    return Sigma;
+}
+
+// 简单的四元数乘法函数实现
+vec4 quatMultiply(vec4 q1, vec4 q2) {
+    return vec4(
+        q1.w*q2.x + q1.x*q2.w + q1.y*q2.z - q1.z*q2.y,
+        q1.w*q2.y - q1.x*q2.z + q1.y*q2.w + q1.z*q2.x,
+        q1.w*q2.z + q1.x*q2.y - q1.y*q2.x + q1.z*q2.w,
+        q1.w*q2.w - q1.x*q2.x - q1.y*q2.y - q1.z*q2.z
+    );
+}
+
+void main()
+{
+	int idx = int(gl_GlobalInvocationID.x);
+	if (idx >= num_gaussians)
+		return;
+	int total_dim = 3 + 4 + 3 + 1 + sh_dim;
+	int start = idx * total_dim;
+	vec4 g_rot = vec4(g_data[start + ROT_IDX], g_data[start + ROT_IDX + 1], g_data[start + ROT_IDX + 2], g_data[start + ROT_IDX + 3]);
+	vec3 g_scale = vec3(g_data[start + SCALE_IDX], g_data[start + SCALE_IDX + 1], g_data[start + SCALE_IDX + 2]);
+
+	// 使用gaussian_scale_factor进行缩放是针对高斯核的缩放
+	mat3 cov3d = computeCov3D(g_scale * gaussian_scale_factor, quatMultiply(g_rot, rot_modifier));
+	int out_start = idx * 6;
+	g_cov3d[out_start] = cov3d[0][0];
+	g_cov3d[out_start + 1] = cov3d[0][1];
+	g_cov3d[out_start + 2] = cov3d[0][2];
+	g_cov3d[out_start + 3] = cov3d[1][1];
+	g_cov3d[out_start + 4] = cov3d[1][2];
+	g_cov3d[out_start + 5] = cov3d[2][2];
+}
@@ -0,0 +1,350 @@
+#version 430 core
+
+// 逐高斯元的预处理：每个高斯元每帧只计算一次投影、二维协方差和球谐颜色，
+// 按绘制顺序写入splat_data，顶点着色器只需根据四边形顶点展开
+// 同时剔除不会产生片段的高斯元，统计每个工作组的可见数量
+// 3D协方差由gau_cov3d_comp.glsl预先计算
+
+#define SH_C0 0.28209479177387814f
+#define SH_C1 0.4886025119029199f
+
+#define SH_C2_0 1.0925484305920792f
+#define SH_C2_1 -1.0925484305920792f
+#define SH_C2_2 0.31539156525252005f
+#define SH_C2_3 -1.0925484305920792f
+#define SH_C2_4 0.5462742152960396f
+
+#define SH_C3_0 -0.5900435899266435f
+#define SH_C3_1 2.890611442640554f
+#define SH_C3_2 -0.4570457994644658f
+#define SH_C3_3 0.3731763325901154f
+#define SH_C3_4 -0.4570457994644658f
+#define SH_C3_5 1.445305721320277f
+#define SH_C3_6 -0.5900435899266435f
+
+layout(local_size_x = 256) in;
+
+#define POS_IDX 0
+#define ROT_IDX 3
+#define SCALE_IDX 7
+#define OPACITY_IDX 10
+#define SH_IDX 11
+
+layout (std430, binding=0) buffer gaussian_data {
+	float g_data[];
+	// compact version of following data
+	// vec3 g_pos[];
+	// vec4 g_rot[];
+	// vec3 g_scale[];
+	// float g_opacity[];
+	// vec3 g_sh[];
+};
+layout (std430, binding=1) buffer gaussian_order {
+	int gi[];
+};
+layout (std430, binding=4) buffer cov3d_data {
+	float g_cov3d[];  // 每个高斯元: xx, xy, xz, yy, yz, zz
+};
+
+// 与gau_vert.glsl中的定义一致
+struct Splat {
+	vec4 center;  // xyz: NDC坐标，w: 1可见，0被剔除
+	vec4 extent;  // xy: NDC空间的四边形半宽高（已乘screen_display_scale_factor），zw: 像素单位的半宽高
+	vec4 conic_alpha;  // xyz: 二维协方差的逆，w: 不透明度
+	vec4 color;  // rgb: 颜色，render_mod == -1时为近似法向量
+};
+layout (std430, binding=3) buffer splat_data {
+	Splat splats[];
+};
+
+// 逐帧的状态，每帧整体上传一次，布局与renderer_ogl.py中的FRAME_UNIFORM_FIELDS一致
+layout (std140, binding=0) uniform frame_data {
+	mat4 view_matrix;
+	mat4 projection_matrix;
+	vec3 hfovxy_focal;
+	float screen_display_scale_factor; // 高斯元在屏幕上的显示大小，用于调整高斯元在屏幕上的显示大小，屏幕上的视觉尺寸
+	vec3 cam_pos;
+	float dc_factor; // 更新DC特征的调整系数并应用所有调整
+	vec3 color_scale_factors; //调整颜色因子
+	float extra_factor; // 更新除DC特征外的调整系数并应用所有调整
+	vec3 light_rotation; // 光照旋转角度，分别对应X、Y、Z轴
+	vec3 points_center;
+	vec3 cubeMin;
+	vec3 cubeMax;
+	mat3 cube_rotation;
+};
+
+uniform int sh_dim;
+uniform int render_mod;  // > 0 render 0-ith SH dim, -1 depth, -2 bill board, -3 gaussian
+
+uniform int num_instances;
+uniform int cull_splats;  // 剔除不产生片段的高斯元（亚像素、视口外、不透明度低于丢弃阈值）
+uniform vec2 viewport_size;  // 离屏帧缓冲的像素大小
+
+// 剔除后由gau_compact_comp.glsl按绘制顺序压缩，绘制时使用间接绘制命令，不需要读回CPU
+struct DrawElementsIndirectCommand {
+	uint count;
+	uint instanceCount;
+	uint firstIndex;
+	int baseVertex;
+	uint baseInstance;
+};
+layout (std430, binding=6) buffer draw_command {
+	DrawElementsIndirectCommand command;
+};
+layout (std430, binding=7) buffer group_data {
+	uint group_counts[];  // 每个工作组的可见数量，gau_scan_comp.glsl之后为该工作组在压缩列表中的起始位置
+};
+
+shared uint group_visible;
+
+vec3 computeCov2D(vec4 mean_view, float focal_x, float focal_y, float tan_fovx, float tan_fovy, mat3 cov3D, mat4 viewmatrix)
+{
+    vec4 t = mean_view;
+    // why need this? Try remove this later
+    float limx = 1.3f * tan_fovx;
+    float limy = 1.3f * tan_fovy;
+    float txtz = t.x / t.z;
+    float tytz = t.y / t.z;
+    t.x = min(limx, max(-limx, txtz)) * t.z;
+    t.y = min(limy, max(-limy, tytz)) * t.z;
+
+    mat3 J = mat3(
+        focal_x / t.z, 0.0f, -(focal_x * t.x) / (t.z * t.z),
+		0.0f, focal_y / t.z, -(focal_y * t.y) / (t.z * t.z),
+		0, 0, 0
+    );
+    mat3 W = transpose(mat3(viewmatrix));
+    mat3 T = W * J;
+
+    mat3 cov = transpose(T) * transpose(cov3D) * T;
+    // Apply low-pass filter: every Gaussian should be at least
+	// one pixel wide/high. Discard 3rd row and column.
+	cov[0][0] += 0.3f;
+	cov[1][1] += 0.3f;
+    return vec3(cov[0][0], cov[0][1], cov[1][1]);
+}
+
+vec3 get_vec3(int offset)
+{
+	return vec3(g_data[offset], g_data[offset + 1], g_data[offset + 2]);
+}
+vec4 get_vec4(int offset)
+{
+	return vec4(g_data[offset], g_data[offset + 1], g_data[offset + 2], g_data[offset + 3]);
+}
+
+// dir是一个默认初始方向
+// rotation是一个三维向量，分别代表绕X、Y、Z轴的旋转角度（以度为单位）
+vec3 rotateLightDirection(vec3 dir, vec3 rotation) {
+    // 将角度从度转换为弧度
+    vec3 radAngles = radians(rotation);
+
+    // 绕X轴旋转
+    vec3 rotatedDir;
+    rotatedDir.x = dir.x;
+    rotatedDir.y = dir.y * cos(radAngles.x) - dir.z * sin(radAngles.x);
+    rotatedDir.z = dir.y * sin(radAngles.x) + dir.z * cos(radAngles.x);
+    dir = rotatedDir;
+
+    // 绕Y轴旋转
+    rotatedDir.x = dir.x * cos(radAngles.y) + dir.z * sin(radAngles.y);
+    rotatedDir.y = dir.y;
+    rotatedDir.z = -dir.x * sin(radAngles.y) + dir.z * cos(radAngles.y);
+    dir = rotatedDir;
+
+    // 绕Z轴旋转
+    rotatedDir.x = dir.x * cos(radAngles.z) - dir.y * sin(radAngles.z);
+    rotatedDir.y = dir.x * sin(radAngles.z) + dir.y * cos(radAngles.z);
+    rotatedDir.z = dir.z;
+    dir = rotatedDir;
+
+    return dir;
+}
+
+void cull(int instance)
+{
+	splats[instance].center = vec4(0.f);
+}
+
+// 四边形覆盖的像素中心（k + 0.5）是否在视口内，亚像素或完全在视口外的高斯元不会产生任何片段
+bool covers_pixels(vec2 center_ndc, vec2 extent_ndc)
+{
+	vec2 lo = ((center_ndc - extent_ndc) * 0.5f + 0.5f) * viewport_size;
+	vec2 hi = ((center_ndc + extent_ndc) * 0.5f + 0.5f) * viewport_size;
+	// 留出少量余量，恰好落在边上的像素中心不剔除
+	vec2 first = max(ceil(lo - 0.5f - 1e-3f), vec2(0.f));
+	vec2 last = min(floor(hi - 0.5f + 1e-3f), viewport_size - 1.f);
+	return all(greaterThanEqual(last, first));
+}
+
+// 计算一个高斯元的绘制数据，返回是否可见
+bool preprocess(int instance)
+{
+	int boxid = gi[instance];
+	int total_dim = 3 + 4 + 3 + 1 + sh_dim;
+	int start = boxid * total_dim;
+	// 渲染包围盒之外的高斯元在CPU上生成排序列表时已被排除
+	vec4 g_pos = vec4(get_vec3(start + POS_IDX), 1.f);
+
+    vec4 g_pos_view = view_matrix * g_pos;
+    vec4 g_pos_screen = projection_matrix * g_pos_view;
+	g_pos_screen.xyz = g_pos_screen.xyz / g_pos_screen.w;
+    g_pos_screen.w = 1.f;
+	// early culling
+	if (any(greaterThan(abs(g_pos_screen.xyz), vec3(1.3))))
+	{
+		cull(instance);
+		return false;
+	}
+	float g_opacity = g_data[start + OPACITY_IDX];
+
+	// 读取预计算的3D协方差矩阵
+	int cov_start = boxid * 6;
+	mat3 cov3d = mat3(
+		g_cov3d[cov_start], g_cov3d[cov_start + 1], g_cov3d[cov_start + 2],
+		g_cov3d[cov_start + 1], g_cov3d[cov_start + 3], g_cov3d[cov_start + 4],
+		g_cov3d[cov_start + 2], g_cov3d[cov_start + 4], g_cov3d[cov_start + 5]
+	);
+    vec2 wh = 2 * hfovxy_focal.xy * hfovxy_focal.z;
+    vec3 cov2d = computeCov2D(g_pos_view, 
+                              hfovxy_focal.z, 
+                              hfovxy_focal.z, 
+                              hfovxy_focal.x, 
+                              hfovxy_focal.y, 
+                              cov3d, 
+                              view_matrix);
+
+    // Invert covariance (EWA algorithm)
+	float det = (cov2d.x * cov2d.z - cov2d.y * cov2d.y);
+	if (det == 0.0f)
+	{
+		cull(instance);
+		return false;
+	}
+    
+    float det_inv = 1.f / det;
+	vec3 conic = vec3(cov2d.z * det_inv, -cov2d.y * det_inv, cov2d.x * det_inv);
+    
+    vec2 quadwh_scr = vec2(3.f * sqrt(cov2d.x), 3.f * sqrt(cov2d.z));  // screen space half quad height and width
+    vec2 quadwh_ndc = quadwh_scr / wh * 2;  // in ndc space
+	if (cull_splats != 0)
+	{
+		// 不透明度低于片段着色器的丢弃阈值时所有片段都会被丢弃（-4和-1模式不使用不透明度）
+		bool uses_alpha = render_mod != -4 && render_mod != -1;
+		if ((uses_alpha && g_opacity < 1.f / 255.f) || !covers_pixels(g_pos_screen.xy, quadwh_ndc * screen_display_scale_factor))
+		{
+			cull(instance);
+			return false;
+		}
+	}
+	// 使用screen_display_scale_factor是在计算高斯元在屏幕上的显示大小时使用的
+	splats[instance].center = vec4(g_pos_screen.xyz, 1.f);
+	splats[instance].extent = vec4(quadwh_ndc * screen_display_scale_factor, quadwh_scr);
+	// 透明度
+	splats[instance].conic_alpha = vec4(conic, g_opacity);
+
+	//Depth
+	if (render_mod == -3)
+	{
+		float depth = -g_pos_view.z;
+		depth = depth < 0.05 ? 1 : depth;
+		depth = 1 / depth;
+		splats[instance].color = vec4(depth, depth, depth, 1.f);
+		return true;
+	}
+
+	//Billboard Normal: 片段着色器只使用近似法向量，不需要颜色
+	if (render_mod == -1)
+	{
+		// 计算指向相机的近似法向量
+		splats[instance].color = vec4(normalize(cam_pos - g_pos.xyz), 1.f);
+		return true;
+	}
+
+	//Normal
+    if (render_mod == -2) {
+        // 计算指向相机的近似法向量
+        vec3 viewDirection = normalize(cam_pos - g_pos.xyz);
+        // 使用法向量计算颜色，这里简单地将法向量的方向映射到颜色上
+        vec3 normalColor = 0.5 * (viewDirection + 1.0); // 将法向量的范围从[-1, 1]映射到[0, 1]
+		splats[instance].color = vec4(normalColor, 1.f);
+        return true;
+    }
+
+	// Covert SH to color
+	int sh_start = start + SH_IDX;
+	vec3 dir = g_pos.xyz - cam_pos;
+    dir = normalize(dir);
+
+	// 使用rotateLightDirection函数来旋转lightDir
+	dir = rotateLightDirection(dir, light_rotation);
+
+	// 计算颜色
+	// 用球谐系数计算颜色
+	// SH_C0 是一个常量，用于调整球谐光照的强度或颜色。
+	// 第0阶球谐系数，通常用于表示环境光照的平均颜色
+	vec3 color = SH_C0 * get_vec3(sh_start);
+	
+	if (sh_dim > 3 && render_mod >= 1)  // 1 * 3
+	{
+		float x = dir.x;
+		float y = dir.y;
+		float z = dir.z;
+		color = color 
+				- SH_C1 * y * get_vec3(sh_start + 1 * 3)  // 对应Y方向影响
+				+ SH_C1 * z * get_vec3(sh_start + 2 * 3)  // 对应Z方向影响
+				- SH_C1 * x * get_vec3(sh_start + 3 * 3); // 对应X方向影响
+
+		// 乘以dc_factor
+		color *= dc_factor;
+
+		if (sh_dim > 12 && render_mod >= 2)  // (1 + 3) * 3
+		{
+			float xx = x * x, yy = y * y, zz = z * z;
+			float xy = x * y, yz = y * z, xz = x * z;
+			color = color +
+				SH_C2_0 * xy * get_vec3(sh_start + 4 * 3) +
+				SH_C2_1 * yz * get_vec3(sh_start + 5 * 3) +
+				SH_C2_2 * (2.0f * zz - xx - yy) * get_vec3(sh_start + 6 * 3) +
+				SH_C2_3 * xz * get_vec3(sh_start + 7 * 3) +
+				SH_C2_4 * (xx - yy) * get_vec3(sh_start + 8 * 3);
+
+			if (sh_dim > 27 && render_mod >= 3)  // (1 + 3 + 5) * 3
+			{
+				color = color +
+					SH_C3_0 * y * (3.0f * xx - yy) * get_vec3(sh_start + 9 * 3) +
+					SH_C3_1 * xy * z * get_vec3(sh_start + 10 * 3) +
+					SH_C3_2 * y * (4.0f * zz - xx - yy) * get_vec3(sh_start + 11 * 3) +
+					SH_C3_3 * z * (2.0f * zz - 3.0f * xx - 3.0f * yy) * get_vec3(sh_start + 12 * 3) +
+					SH_C3_4 * x * (4.0f * zz - xx - yy) * get_vec3(sh_start + 13 * 3) +
+					SH_C3_5 * z * (xx - yy) * get_vec3(sh_start + 14 * 3) +
+					SH_C3_6 * x * (xx - 3.0f * yy) * get_vec3(sh_start + 15 * 3);
+			}
+			// 乘以额外特征的调整系数
+			color *= extra_factor;
+		}
+	}
+	color += 0.5f;
+
+	color *= color_scale_factors; // 将颜色向量的每个分量乘以对应的缩放因子
+	splats[instance].color = vec4(color, 1.f);
+	return true;
+}
+
+void main()
+{
+	if (gl_LocalInvocationIndex == 0)
+		group_visible = 0;
+	barrier();
+	int instance = int(gl_GlobalInvocationID.x);
+	if (instance < num_instances && preprocess(instance))
+		atomicAdd(group_visible, 1u);
+	barrier();
+	// 每个工作组的可见数量用于计算压缩后的位置，总数直接写入间接绘制命令
+	if (gl_LocalInvocationIndex == 0)
+	{
+		group_counts[gl_WorkGroupID.x] = group_visible;
+		atomicAdd(command.instanceCount, group_visible);
+	}
+}
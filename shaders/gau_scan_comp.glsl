@@ -0,0 +1,48 @@
+#version 430 core
+
+// 对每个工作组的可见数量求前缀和，得到各工作组在压缩列表中的起始位置
+// 只派发一个工作组：每个线程先顺序累加一段，再在共享内存中对各段的和求前缀和
+
+#define LOCAL_SIZE 1024
+
+layout(local_size_x = LOCAL_SIZE) in;
+
+layout (std430, binding=7) buffer group_data {
+	uint group_counts[];  // 输入为可见数量，输出为起始位置（不含本组）
+};
+
+uniform int num_groups;
+
+shared uint partial[LOCAL_SIZE];
+
+void main()
+{
+	uint tid = gl_LocalInvocationIndex;
+	uint total = uint(num_groups);
+	uint per_thread = (total + LOCAL_SIZE - 1) / LOCAL_SIZE;
+	uint begin = min(tid * per_thread, total);
+	uint end = min(begin + per_thread, total);
+
+	uint sum = 0;
+	for (uint i = begin; i < end; i++)
+		sum += group_counts[i];
+	partial[tid] = sum;
+	barrier();
+
+	// Hillis-Steele包含前缀和
+	for (uint offset = 1; offset < LOCAL_SIZE; offset <<= 1)
+	{
+		uint value = tid >= offset ? partial[tid - offset] : 0;
+		barrier();
+		partial[tid] += value;
+		barrier();
+	}
+
+	uint running = partial[tid] - sum;
+	for (uint i = begin; i < end; i++)
+	{
+		uint count = group_counts[i];
+		group_counts[i] = running;
+		running += count;
+	}
+}
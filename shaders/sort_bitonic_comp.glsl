@@ -0,0 +1,95 @@
+#version 430 core
+
+// 双调排序，按sort_keys升序重排gaussian_order
+// sort_mode 0: 全局比较交换，处理一个(stage_k, stage_j)
+// sort_mode 1: 在共享内存中完成当前stage_k中所有 stage_j <= LOCAL_SIZE 的步骤
+// sort_mode 2: 在共享内存中对每个 2*LOCAL_SIZE 的块完成 stage_k <= 2*LOCAL_SIZE 的全部步骤
+
+#define LOCAL_SIZE 256
+
+layout(local_size_x = LOCAL_SIZE) in;
+
+layout (std430, binding=1) buffer gaussian_order {
+	int gi[];
+};
+layout (std430, binding=2) buffer sort_keys {
+	uint keys[];
+};
+
+uniform int sort_mode;
+uniform int stage_k;
+uniform int stage_j;
+
+shared uint local_keys[2 * LOCAL_SIZE];
+shared int local_values[2 * LOCAL_SIZE];
+
+void compare_and_swap_local(int i, int l, bool ascending)
+{
+	uint key_i = local_keys[i];
+	uint key_l = local_keys[l];
+	if ((key_i > key_l) == ascending)
+	{
+		local_keys[i] = key_l;
+		local_keys[l] = key_i;
+		int value = local_values[i];
+		local_values[i] = local_values[l];
+		local_values[l] = value;
+	}
+}
+
+void local_steps(int base, int t, int k, int j_start)
+{
+	for (int j = j_start; j > 0; j >>= 1)
+	{
+		int i = 2 * j * (t / j) + (t % j);
+		compare_and_swap_local(i, i + j, ((base + i) & k) == 0);
+		barrier();
+	}
+}
+
+void main()
+{
+	int t = int(gl_LocalInvocationID.x);
+
+	if (sort_mode == 0)
+	{
+		int pair = int(gl_GlobalInvocationID.x);
+		int i = 2 * stage_j * (pair / stage_j) + (pair % stage_j);
+		int l = i + stage_j;
+		bool ascending = (i & stage_k) == 0;
+		uint key_i = keys[i];
+		uint key_l = keys[l];
+		if ((key_i > key_l) == ascending)
+		{
+			keys[i] = key_l;
+			keys[l] = key_i;
+			int value = gi[i];
+			gi[i] = gi[l];
+			gi[l] = value;
+		}
+		return;
+	}
+
+	// 每个工作组把 2*LOCAL_SIZE 个元素载入共享内存
+	int base = int(gl_WorkGroupID.x) * 2 * LOCAL_SIZE;
+	local_keys[t] = keys[base + t];
+	local_keys[t + LOCAL_SIZE] = keys[base + t + LOCAL_SIZE];
+	local_values[t] = gi[base + t];
+	local_values[t + LOCAL_SIZE] = gi[base + t + LOCAL_SIZE];
+	barrier();
+
+	if (sort_mode == 1)
+	{
+		local_steps(base, t, stage_k, stage_j);
+	}
+	else
+	{
+		for (int k = 2; k <= 2 * LOCAL_SIZE; k <<= 1)
+			local_steps(base, t, k, k >> 1);
+	}
+
+	keys[base + t] = local_keys[t];
+	keys[base + t + LOCAL_SIZE] = local_keys[t + LOCAL_SIZE];
+	gi[base + t] = local_values[t];
+	gi[base + t + LOCAL_SIZE] = local_values[t + LOCAL_SIZE];
+}
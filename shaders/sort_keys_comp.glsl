@@ -0,0 +1,45 @@
+#version 430 core
+
+// 由gaussian_data计算每个高斯元的视图空间深度，转换为可按无符号整数比较的排序键
+// 相机看向-z，深度升序即从远到近（back-to-front）
+
+layout(local_size_x = 256) in;
+
+#define POS_IDX 0
+
+layout (std430, binding=0) buffer gaussian_data {
+	float g_data[];
+};
+layout (std430, binding=1) buffer gaussian_order {
+	int gi[];
+};
+layout (std430, binding=2) buffer sort_keys {
+	uint keys[];
+};
+
+uniform mat4 view_matrix;
+uniform int sh_dim;
+uniform int num_gaussians;
+uniform int num_padded;  // 补齐到2的幂，补齐部分的键为最大值，排序后位于末尾
+
+void main()
+{
+	int idx = int(gl_GlobalInvocationID.x);
+	if (idx >= num_padded)
+		return;
+	gi[idx] = idx;
+	if (idx >= num_gaussians)
+	{
+		keys[idx] = 0xFFFFFFFFu;
+		return;
+	}
+
+	int total_dim = 3 + 4 + 3 + 1 + sh_dim;
+	int start = idx * total_dim + POS_IDX;
+	vec4 g_pos = vec4(g_data[start], g_data[start + 1], g_data[start + 2], 1.f);
+	float depth = (view_matrix * g_pos).z;
+
+	// 浮点数转为保序的无符号整数：负数按位取反，正数翻转符号位
+	uint bits = floatBitsToUint(depth);
+	keys[idx] = (bits & 0x80000000u) != 0u ? ~bits : bits | 0x80000000u;
+}
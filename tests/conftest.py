@@ -0,0 +1,54 @@
+import ctypes
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 测试从仓库根目录导入render、util等模块
+sys.path.insert(0, REPO_ROOT)
+
+# 渲染器的测试在离屏的EGL上下文中运行，必须在导入OpenGL之前选择平台
+if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+    os.environ.setdefault('PYOPENGL_PLATFORM', 'egl')
+    os.environ.setdefault('EGL_PLATFORM', 'surfaceless')
+
+
+def _make_egl_context(width, height):
+    from OpenGL import EGL
+    display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+    major, minor = EGL.EGLint(), EGL.EGLint()
+    if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+        return False
+    attributes = (EGL.EGLint * 13)(
+        EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT, EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+        EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8, EGL.EGL_ALPHA_SIZE, 8, EGL.EGL_NONE)
+    config, num_configs = EGL.EGLConfig(), EGL.EGLint()
+    if not EGL.eglChooseConfig(display, attributes, ctypes.pointer(config), 1, ctypes.pointer(num_configs)) \
+            or num_configs.value == 0:
+        return False
+    surface = EGL.eglCreatePbufferSurface(
+        display, config, (EGL.EGLint * 5)(EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE))
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+    # 计算着色器和glProgramUniform*需要OpenGL 4.3
+    context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, (EGL.EGLint * 7)(
+        EGL.EGL_CONTEXT_MAJOR_VERSION, 4, EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+        EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT, EGL.EGL_NONE))
+    return bool(context) and bool(EGL.eglMakeCurrent(display, surface, surface, context))
+
+
+@pytest.fixture(scope='session')
+def gl_context():
+    """64x64的离屏OpenGL 4.3上下文，无法创建时跳过测试"""
+    if os.environ.get('PYOPENGL_PLATFORM') != 'egl':
+        pytest.skip("renderer tests need a headless EGL context")
+    try:
+        created = _make_egl_context(64, 64)
+    except Exception as e:
+        pytest.skip(f"EGL is not available: {e!r}")
+    if not created:
+        pytest.skip("failed to create an EGL context")
+    # 着色器的路径相对于仓库根目录
+    os.chdir(REPO_ROOT)
+    return 64, 64
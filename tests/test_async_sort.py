@@ -0,0 +1,48 @@
+import time
+
+import numpy as np
+
+from render import renderer_ogl
+
+
+class _Gaussians:
+    def __init__(self, xyz):
+        self.xyz = xyz
+
+    def __len__(self):
+        return len(self.xyz)
+
+
+def _wait_result(sorter, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        result = sorter.fetch()
+        if result is not None:
+            return result
+        time.sleep(0.01)
+    return None
+
+
+def test_async_sort_survives_sort_error(monkeypatch, capsys):
+    gaus = _Gaussians(np.random.default_rng(0).standard_normal((100, 3)).astype(np.float32))
+    view_mat = np.eye(4, dtype=np.float32)
+    real_sort = renderer_ogl.sort_gaussian
+    calls = []
+
+    def failing_once(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError("sort backend failed")
+        return real_sort(*args)
+
+    monkeypatch.setattr(renderer_ogl, "sort_gaussian", failing_once)
+    sorter = renderer_ogl.AsyncGaussianSorter()
+    sorter.submit(1, gaus, view_mat)
+    assert _wait_result(sorter, timeout=0.5) is None
+    assert "Async sort failed" in capsys.readouterr().out
+
+    # 后台线程仍然处理之后的请求
+    sorter.submit(2, gaus, view_mat)
+    result = _wait_result(sorter)
+    assert result is not None and result[0] == 2
+    assert sorted(result[1].reshape(-1)) == list(range(len(gaus)))
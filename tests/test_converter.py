@@ -0,0 +1,197 @@
+import os
+import re
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from plyfile import PlyData, PlyElement
+from scipy.spatial.transform import Rotation
+
+import util_gau
+from tools.gsconverter.api import convert_data
+from tools.gsconverter.utils.base_converter import BaseConverter
+from tools.gsconverter.utils.utility import Utility
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _vertices(num, sh_degree=0, seed=0):
+    rng = np.random.default_rng(seed)
+    dtype, _ = BaseConverter.define_dtype(has_scal=False, sh_degree=sh_degree)
+    data = np.zeros(num, dtype=dtype)
+    for name in ('x', 'y', 'z'):
+        data[name] = rng.standard_normal(num)
+    data['rot_0'] = 1.0
+    return data
+
+
+def _prune_counts(output):
+    match = re.search(r"flagged (\d+) splats by opacity, (\d+) by volume and (\d+) by opacity x footprint", output)
+    return tuple(int(count) for count in match.groups())
+
+
+def test_prune_drop_counts(capsys):
+    data = _vertices(109)
+    data['opacity'] = 2.0
+    # 4个只因不透明度被剔除：sigmoid(-6) ≈ 0.0025 < 0.004
+    data['opacity'][:4] = -6.0
+    # 3个只因体积被剔除：细针状，最大截面不变
+    data['scale_2'][4:7] = -9.0
+    # 2个只因 不透明度 x 截面 被剔除：不透明度0.01，体积在阈值之上
+    data['opacity'][7:9] = np.log(0.01 / 0.99)
+    for i in range(3):
+        data[f'scale_{i}'][7:9] = -1.5
+
+    pruned = BaseConverter(data).prune()
+    assert _prune_counts(capsys.readouterr().out) == (4, 3, 2)
+    assert len(pruned) == 100
+    assert np.all(pruned['opacity'] == 2.0)
+
+
+def test_prune_opacity_matches_sigmoid():
+    data = _vertices(5000, seed=1)
+    rng = np.random.default_rng(1)
+    data['opacity'] = rng.uniform(-12, 2, len(data)).astype(np.float32)
+    for min_opacity in (1e-4, 0.004, 0.05, 0.5):
+        # 关闭体积和截面两项，只比较不透明度的阈值
+        pruned = BaseConverter(data).prune(min_opacity, 1e-300, 1e-300)
+        opacity = 1.0 / (1.0 + np.exp(-data['opacity'].astype(np.float64)))
+        np.testing.assert_array_equal(pruned, data[opacity >= min_opacity])
+
+
+def _write_ply(data, path):
+    PlyData([PlyElement.describe(data, 'vertex')], byte_order='=').write(str(path))
+
+
+def test_reduce_sh_degree_round_trip(tmp_path):
+    data = _vertices(50, sh_degree=3)
+    rng = np.random.default_rng(2)
+    for name in data.dtype.names:
+        if name.startswith('f_'):
+            data[name] = rng.standard_normal(len(data))
+    _write_ply(data, tmp_path / "sh3.ply")
+    assert util_gau.load_ply(str(tmp_path / "sh3.ply")).sh_dim == 48
+
+    converter = BaseConverter(PlyData.read(str(tmp_path / "sh3.ply"))['vertex'].data)
+    assert converter.get_sh_degree() == 3
+    reduced = converter.reduce_sh_degree(1)
+    assert list(reduced.dtype.names) == [name for name, _ in BaseConverter.define_dtype(False, sh_degree=1)[0]]
+    _write_ply(reduced, tmp_path / "sh1.ply")
+
+    reloaded = PlyData.read(str(tmp_path / "sh1.ply"))['vertex'].data
+    assert BaseConverter(reloaded).get_sh_degree() == 1
+    gaus = util_gau.load_ply(str(tmp_path / "sh1.ply"))
+    assert gaus.sh_dim == 12
+    # 每个通道保留前3个系数，f_rest_*按通道排列：R的全部系数，然后G，然后B
+    for channel in range(3):
+        np.testing.assert_array_equal(gaus.sh[:, channel], data[f'f_dc_{channel}'])
+        for coeff in range(3):
+            expected = data[f'f_rest_{channel * 15 + coeff}']
+            np.testing.assert_array_equal(reloaded[f'f_rest_{channel * 3 + coeff}'], expected)
+            np.testing.assert_array_equal(gaus.sh[:, 3 + coeff * 3 + channel], expected)
+
+
+def test_find_voxel_size_within_budget():
+    xyz = np.random.default_rng(3).uniform(-5, 5, (20000, 3))
+    for target in (50, 1000, 5000):
+        voxel_size = BaseConverter.find_voxel_size(xyz, target)
+        keys = Utility.voxel_keys(xyz, voxel_size)
+        # 线性键与逐轴的体素坐标一一对应
+        coords = np.floor((xyz - xyz.min(axis=0)) / voxel_size).astype(np.int64)
+        assert len(np.unique(keys)) == len(np.unique(coords, axis=0))
+        assert 0.9 * target <= len(np.unique(keys)) <= target
+
+
+def test_decimate_moment_matching():
+    data = _vertices(2)
+    xyz = np.array([[0.0, 0.0, 0.0], [0.3, -0.2, 0.1]])
+    scales = np.array([[0.1, 0.2, 0.05], [0.3, 0.1, 0.1]])
+    quats = np.array([[1.0, 0.0, 0.0, 0.0], [np.cos(0.4), 0.0, np.sin(0.4), 0.0]])
+    opacity = np.array([0.8, 0.3])
+    for i, name in enumerate(('x', 'y', 'z')):
+        data[name] = xyz[:, i]
+    for i in range(3):
+        data[f'scale_{i}'] = np.log(scales[:, i])
+    for i in range(4):
+        data[f'rot_{i}'] = quats[:, i]
+    data['opacity'] = np.log(opacity / (1 - opacity))
+    data['f_dc_0'] = [1.0, -1.0]
+
+    merged = BaseConverter(data).decimate(1)
+    assert len(merged) == 1
+
+    # 解析的矩匹配结果：以不透明度为权重的均值，以及子高斯协方差加上均值离散度的加权平均
+    weights = opacity / opacity.sum()
+    mean = weights @ xyz
+    covs = [Utility.quaternion_to_rotation_matrix(q[None])[0] @ np.diag(s ** 2)
+            @ Utility.quaternion_to_rotation_matrix(q[None])[0].T for q, s in zip(quats, scales)]
+    cov = sum(w * (c + np.outer(p - mean, p - mean)) for w, c, p in zip(weights, covs, xyz))
+
+    np.testing.assert_allclose([merged['x'][0], merged['y'][0], merged['z'][0]], mean, rtol=1e-5, atol=1e-6)
+    q = np.array([[merged[f'rot_{i}'][0] for i in range(4)]], dtype=np.float64)
+    s = np.exp([merged[f'scale_{i}'][0] for i in range(3)])
+    R = Utility.quaternion_to_rotation_matrix(q)[0]
+    np.testing.assert_allclose(R @ np.diag(s ** 2) @ R.T, cov, rtol=1e-4, atol=1e-7)
+    np.testing.assert_allclose(merged['f_dc_0'][0], weights @ [1.0, -1.0], rtol=1e-5)
+
+
+def test_quaternion_matrix_round_trip():
+    q = np.random.default_rng(4).standard_normal((1000, 4))
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    R = Utility.quaternion_to_rotation_matrix(q)
+    # 与scipy一致（scipy的四元数为(x, y, z, w)）
+    np.testing.assert_allclose(R, Rotation.from_quat(q[:, [1, 2, 3, 0]]).as_matrix(), atol=1e-12)
+    back = Utility.rotation_matrix_to_quaternion(R)
+    # q与-q表示同一个旋转
+    back *= np.sign(np.sum(back * q, axis=1, keepdims=True))
+    np.testing.assert_allclose(back, q, atol=1e-9)
+
+
+def _scene(num, sh_degree=3, seed=5):
+    data = _vertices(num, sh_degree=sh_degree, seed=seed)
+    rng = np.random.default_rng(seed)
+    for name in data.dtype.names:
+        if name.startswith('f_'):
+            data[name] = rng.standard_normal(num)
+    data['opacity'] = rng.uniform(-8, 4, num)
+    for i in range(3):
+        data[f'scale_{i}'] = rng.uniform(-9, -3, num)
+    rot = rng.standard_normal((num, 4))
+    rot /= np.linalg.norm(rot, axis=1, keepdims=True)
+    for i in range(4):
+        data[f'rot_{i}'] = rot[:, i]
+    return data
+
+
+@pytest.mark.parametrize('flags, options', [
+    (['--prune'], dict(prune=True)),
+    (['--sh_degree', '1'], dict(sh_degree=1)),
+    (['--decimate', '300'], dict(decimate=300)),
+    (['-f', 'cc', '--rgb'], dict(target_format='cc', rgb=True)),
+])
+def test_convert_data_matches_cli(tmp_path, flags, options):
+    data = _scene(1000)
+    _write_ply(data, tmp_path / "input.ply")
+    command = [sys.executable, '-m', 'tools.gsconverter.main', '-i', str(tmp_path / "input.ply"),
+               '-o', str(tmp_path / "cli.ply"), '-f', '3dgs'] + flags
+    subprocess.run(command, cwd=REPO_ROOT, check=True, capture_output=True)
+    expected = PlyData.read(str(tmp_path / "cli.ply"))['vertex'].data
+
+    converted = convert_data(data, output=str(tmp_path / "api"), **options)
+    # 转换器返回结构化数组，而不是PlyData的元素
+    assert isinstance(converted, np.ndarray) and converted.dtype.names == expected.dtype.names
+    np.testing.assert_array_equal(converted, expected)
+    np.testing.assert_array_equal(PlyData.read(str(tmp_path / "api.ply"))['vertex'].data, expected)
+
+
+def test_convert_gaussian_data(tmp_path):
+    data = _scene(500, sh_degree=2)
+    _write_ply(data, tmp_path / "input.ply")
+    gaus = util_gau.load_ply(str(tmp_path / "input.ply"))
+    vertices = gaus.to_structured_array()
+    assert vertices.dtype.names == data.dtype.names
+    for name in data.dtype.names:
+        np.testing.assert_allclose(vertices[name], data[name], rtol=1e-4, atol=1e-5)
+    # GaussianData与其结构化数组的转换结果相同
+    np.testing.assert_array_equal(convert_data(gaus, prune=True), convert_data(vertices, prune=True))
@@ -0,0 +1,76 @@
+import glm
+import numpy as np
+
+import util_gau
+from render.gaussian_lod import GaussianLOD
+from render.renderer_ogl import _frustum_visible
+
+
+def _gaussians(num, center=(0, 0, 0), seed=0):
+    rng = np.random.default_rng(seed)
+    rot = rng.standard_normal((num, 4)).astype(np.float32)
+    rot /= np.linalg.norm(rot, axis=1, keepdims=True)
+    return util_gau.GaussianData(
+        xyz=(rng.standard_normal((num, 3)) + center).astype(np.float32),
+        rot=rot,
+        scale=np.exp(rng.uniform(-5, -3, (num, 3))).astype(np.float32),
+        opacity=rng.uniform(0.1, 1, (num, 1)).astype(np.float32),
+        sh=rng.uniform(-1, 1, (num, 3)).astype(np.float32),
+    )
+
+
+def _camera(position, target, near=0.01):
+    view = np.array(glm.lookAt(glm.vec3(*position), glm.vec3(*target), glm.vec3(0, 1, 0)))
+    proj = np.array(glm.perspective(np.pi / 2, 1.0, near, 100.0))
+    return view, proj
+
+
+def test_select_behind_camera():
+    # 场景整体在相机之后：旧实现会把这些节点一直展开到叶子
+    lod = GaussianLOD(_gaussians(2000, center=(0, 0, 10)))
+    view, proj = _camera((0, 0, 0), (0, 0, -1))
+    selected = lod.select(view, proj, 64, near=0.01)
+    assert not selected.any()
+
+
+def test_select_covers_visible_leaves():
+    lod = GaussianLOD(_gaussians(2000))
+    view, proj = _camera((0, 0, 1.5), (0, 0, 0))
+    selected = lod.select(view, proj, 64, error_budget=1e-9, near=0.01)
+    # 误差预算接近0时只选择叶子，且视锥内的叶子都被选中
+    assert not selected[lod.num_leaves:].any()
+    visible = _frustum_visible(lod.gaussians.xyz[:lod.num_leaves], lod.bound[:lod.num_leaves], proj @ view)
+    assert visible.any() and not visible.all()
+    assert np.all(selected[:lod.num_leaves] >= visible)
+
+
+def test_select_coarse_far_away():
+    lod = GaussianLOD(_gaussians(2000))
+    view, proj = _camera((0, 0, 60), (0, 0, 0))
+    selected = lod.select(view, proj, 64, error_budget=2.0, near=0.01)
+    assert 0 < selected.sum() < lod.num_leaves / 8
+
+
+def test_save_load(tmp_path):
+    gaus = _gaussians(1000)
+    gaus.path = str(tmp_path / "scene.ply")
+    lod = GaussianLOD(gaus)
+    assert lod.gaussians.xyz.dtype == np.float32
+    path = GaussianLOD.cache_path(gaus)
+    lod.save(path)
+    loaded = GaussianLOD.load(path, gaus)
+    assert loaded.source is gaus and loaded.num_leaves == lod.num_leaves
+    np.testing.assert_array_equal(loaded.gaussians.flat(), lod.gaussians.flat())
+    view, proj = _camera((0, 0, 3), (0, 0, 0))
+    np.testing.assert_array_equal(loaded.select(view, proj, 64), lod.select(view, proj, 64))
+    # 数据改变后缓存失效
+    assert GaussianLOD.load(path, _gaussians(1000, seed=1)) is None
+
+
+def test_build_async(tmp_path):
+    gaus = _gaussians(1000)
+    gaus.path = str(tmp_path / "scene.ply")
+    path = GaussianLOD.cache_path(gaus)
+    lod = GaussianLOD.build_async(gaus, cache_path=path).result(timeout=60)
+    assert lod.source is gaus
+    assert GaussianLOD.load(path, gaus) is not None
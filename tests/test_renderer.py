@@ -0,0 +1,168 @@
+import threading
+import time
+
+import glm
+import numpy as np
+import pytest
+
+import util
+import util_gau
+
+
+def _scene(num=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    return util_gau.GaussianData(
+        xyz=rng.uniform(-20, 20, (num, 3)).astype(np.float32),
+        rot=np.tile(np.array([[1, 0, 0, 0]], np.float32), (num, 1)),
+        scale=np.exp(rng.uniform(-5, -3, (num, 3))).astype(np.float32),
+        opacity=rng.uniform(0.1, 1, (num, 1)).astype(np.float32),
+        sh=rng.uniform(-1, 1, (num, 3)).astype(np.float32),
+    )
+
+
+def _make_renderer(gl_context, gaus, lod=None):
+    from render.renderer_ogl import OpenGLRenderer
+    w, h = gl_context
+    r = OpenGLRenderer(w, h, util.Camera(h, w))
+    r.auto_tune_sort = False
+    if lod is not None:
+        r.use_lod, r.lod = True, lod
+    r.update_gaussian_data(gaus)
+    r.set_scale_modifier(1.0)
+    r.set_screen_scale_factor(1.0)
+    r.set_rot_modifier([0, 0, 0])
+    r.set_render_mod(0)
+    r.update_camera_pose()
+    r.update_camera_intrin()
+    r.gpu_sort = False
+    return r
+
+
+@pytest.fixture
+def renderer(gl_context):
+    return _make_renderer(gl_context, _scene())
+
+
+def _frustum_ids(r):
+    from render.renderer_ogl import _frustum_visible
+    visible = _frustum_visible(r.gaussians.xyz, r.cull_radius * r.scale_modifier, r.proj_matrix @ r.view_matrix)
+    return set(np.flatnonzero(visible).tolist())
+
+
+def _assert_subsequence(index, order):
+    # index中的高斯元在order中的位置递增，即沿用了排序的结果
+    order = order.reshape(-1)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    assert np.all(np.diff(rank[index.reshape(-1)]) > 0)
+
+
+def test_cull_follows_camera_without_auto_sort(renderer):
+    r = renderer
+    assert r.frustum_culling and not r.auto_sort_enabled
+    r.sort_and_update()
+    first = _frustum_ids(r)
+    assert 0 < len(first) < len(r.gaussians)
+    assert set(r.draw_index.reshape(-1).tolist()) == first
+
+    # 只移动相机，不重新排序
+    r.camera.target = np.array([15.0, 0.0, -10.0], dtype=np.float32)
+    r.update_camera_pose()
+    r.draw()
+    moved = _frustum_ids(r)
+    assert moved != first
+    assert set(r.draw_index.reshape(-1).tolist()) == moved
+    assert r.num_instances == len(moved)
+    _assert_subsequence(r.draw_index, r.sorted_index)
+
+
+@pytest.mark.parametrize('auto_sort', [False, True])
+def test_lod_cut_follows_camera(gl_context, auto_sort):
+    from render.gaussian_lod import GaussianLOD
+    gaus = _scene()
+    r = _make_renderer(gl_context, gaus, GaussianLOD(gaus))
+    assert r.lod_active
+    r.async_sort = False
+    r.set_auto_sort(auto_sort)
+    r.sort_and_update()
+
+    def frame():
+        # 与界面的每帧调用相同：开启自动排序时先检查是否需要排序
+        if auto_sort:
+            r.auto_sort()
+        r.draw()
+        cut = r.lod.select(r.view_matrix, r.proj_matrix, r.render_size[1], r.lod_error, near=r.camera.znear)
+        expected = set(np.flatnonzero(cut).tolist()) & _frustum_ids(r)
+        assert set(r.draw_index.reshape(-1).tolist()) == expected
+        return expected
+
+    far = frame()
+    # 拉近相机，截面细化
+    r.camera.target_dist = 1.0
+    r.update_camera_pose()
+    near = frame()
+    leaves = lambda ids: sum(i < r.lod.num_leaves for i in ids)
+    assert leaves(near) > 0 and near != far
+    # 转向另一侧，之前被剔除的子树出现
+    r.camera.rotation = glm.angleAxis(np.pi, glm.vec3(0, 1, 0))
+    r.update_camera_pose()
+    behind = frame()
+    assert behind - far - near
+
+
+def test_async_sort_culls_with_predicted_view(renderer):
+    r = renderer
+    r.set_auto_sort(True)
+    assert r.async_sort
+    camera = util.Camera(*r.render_size[::-1])
+    camera.target = np.array([15.0, 0.0, -10.0], dtype=np.float32)
+    predicted = np.asarray(camera.get_view_matrix(), dtype=np.float64)
+    r.sort_scheduler.predict_view_matrix = lambda view_matrix: predicted
+    r.sort_and_update_async()
+    deadline = time.perf_counter() + 30
+    while r.sorted_index is None and time.perf_counter() < deadline:
+        time.sleep(0.01)
+        r.poll_async_sort()
+    assert r.sorted_index is not None
+
+    # 剔除与排序使用同一个外推的视图矩阵
+    current = _frustum_ids(r)
+    r.view_matrix = predicted
+    expected = _frustum_ids(r)
+    assert expected != current
+    assert set(r.draw_index.reshape(-1).tolist()) == expected
+    depth = (r.gaussians.xyz @ predicted[2, :3].astype(np.float32))[r.draw_index.reshape(-1)]
+    # 基数排序按量化后的深度排序，允许量化误差以内的逆序
+    assert np.all(np.diff(depth) >= -1e-3 * np.ptp(depth))
+
+
+def test_autotune_sort_off_render_thread(gl_context, tmp_path, monkeypatch):
+    from render import renderer_ogl
+    monkeypatch.setattr(renderer_ogl, '_SORT_BENCHMARK_CACHE', str(tmp_path / "sort_benchmark.json"))
+    benchmark_sort_backends = renderer_ogl.benchmark_sort_backends
+    benchmark_threads = []
+
+    def benchmark(*args, **kwargs):
+        benchmark_threads.append(threading.current_thread())
+        return benchmark_sort_backends(*args, **kwargs)
+
+    monkeypatch.setattr(renderer_ogl, 'benchmark_sort_backends', benchmark)
+    r = _make_renderer(gl_context, _scene())
+    default = r.current_sort_backend()
+    r.autotune_sort_backend()
+    # 加载时不测量，保持默认后端直到结果返回
+    assert r.sort_tuning is not None and not r.sort_benchmark
+    assert r.current_sort_backend() == default
+    deadline = time.perf_counter() + 60
+    while r.sort_tuning is not None and time.perf_counter() < deadline:
+        r.draw()
+        time.sleep(0.01)
+    assert r.sort_tuning is None
+    assert benchmark_threads and benchmark_threads[0] is not threading.main_thread()
+    assert set(r.sort_benchmark) == set(r.sort_backend_names())
+    assert r.current_sort_backend() == min(r.sort_benchmark, key=r.sort_benchmark.get)
+
+    # 之后相同规模的场景直接使用缓存的结果
+    r.update_gaussian_data(_scene(seed=1))
+    r.autotune_sort_backend()
+    assert r.sort_tuning is None and r.sort_benchmark
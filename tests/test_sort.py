@@ -0,0 +1,90 @@
+import glm
+import numpy as np
+import pytest
+
+import util_gau
+from render import renderer_ogl
+
+
+def _gaussians(num, seed=0):
+    rng = np.random.default_rng(seed)
+    rot = rng.standard_normal((num, 4)).astype(np.float32)
+    rot /= np.linalg.norm(rot, axis=1, keepdims=True)
+    return util_gau.GaussianData(
+        xyz=rng.standard_normal((num, 3)).astype(np.float32),
+        rot=rot,
+        scale=np.full((num, 3), 0.01, dtype=np.float32),
+        opacity=np.full((num, 1), 0.5, dtype=np.float32),
+        sh=rng.uniform(-1, 1, (num, 3)).astype(np.float32),
+    )
+
+
+def _view_matrix(position, target):
+    # 与util.Camera一致：glm.lookAt生成的矩阵
+    return np.array(glm.lookAt(glm.vec3(*position), glm.vec3(*target), glm.vec3(0, 1, 0)))
+
+
+@pytest.fixture(params=list(renderer_ogl._sort_backends))
+def backend(request):
+    previous = renderer_ogl._sort_backend_name
+    renderer_ogl.set_sort_backend(request.param)
+    yield request.param
+    renderer_ogl.set_sort_backend(previous)
+
+
+def test_sort_empty_frustum(backend):
+    gaus = _gaussians(1000)
+    view_mat = _view_matrix((0, 0, 5), (0, 0, 0))
+    index = renderer_ogl.sort_gaussian(gaus, view_mat, np.zeros(len(gaus), dtype=bool))
+    assert index.shape == (0, 1)
+    assert index.dtype == np.int32
+
+
+def test_sort_looking_away_from_scene(backend):
+    gaus = _gaussians(1000)
+    # 相机在场景外并背对场景，视锥内没有高斯元
+    view_mat = _view_matrix((0, 0, 20), (0, 0, 40))
+    proj = np.array(glm.perspective(np.pi / 2, 1.0, 0.001, 500), dtype=np.float32)
+    radius = np.full(len(gaus), 0.03, dtype=np.float32)
+    visible = renderer_ogl._frustum_visible(gaus.xyz, radius, proj @ view_mat)
+    assert not visible.any()
+    index = renderer_ogl.sort_gaussian(gaus, view_mat, visible)
+    assert len(index) == 0
+
+
+def _check_sorted_subset(gaus, view_mat, ids, index):
+    index = index.reshape(-1)
+    assert index.dtype == np.int32
+    assert np.array_equal(np.sort(index), np.sort(ids))
+    depth = gaus.xyz[index] @ view_mat[2, :3] + view_mat[2, 3]
+    # 基数排序把深度量化为16位键，相邻元素允许一个量化步长的误差
+    step = (depth.max() - depth.min()) / (2 ** 16 - 1)
+    assert np.all(np.diff(depth) >= -2 * step)
+
+
+def test_sort_culled_subset(backend):
+    gaus = _gaussians(5000)
+    view_mat = _view_matrix((1, 2, 5), (0, 0, 0))
+    visible = np.random.default_rng(1).random(len(gaus)) < 0.3
+    index = renderer_ogl.sort_gaussian(gaus, view_mat, visible)
+    _check_sorted_subset(gaus, view_mat, np.flatnonzero(visible), index)
+
+
+def test_parallel_sort_culled_subset():
+    gaus = _gaussians(300000)
+    view_mat = _view_matrix((1, 2, 5), (0, 0, 0))
+    ids = np.flatnonzero(np.random.default_rng(2).random(len(gaus)) < 0.7).astype(np.int32)
+    index = renderer_ogl._sort_gaussian_cpu_parallel(gaus, view_mat, ids, num_threads=2)
+    _check_sorted_subset(gaus, view_mat, ids, index)
+
+
+def test_culled_sort_reuses_radix_buffers():
+    gaus = _gaussians(5000)
+    rng = np.random.default_rng(3)
+    renderer_ogl._sort_gaussian_cpu_radix(gaus, _view_matrix((0, 0, 5), (0, 0, 0)))
+    buffers = renderer_ogl._radix_buffers
+    for position in ((1, 0, 5), (0, 1, 5), (-1, 0, 5)):
+        ids = np.flatnonzero(rng.random(len(gaus)) < 0.5).astype(np.int32)
+        renderer_ogl._sort_gaussian_cpu_radix(gaus, _view_matrix(position, (0, 0, 0)), ids)
+        # 可见集合变化时不重新分配缓冲区
+        assert renderer_ogl._radix_buffers is buffers
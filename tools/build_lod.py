@@ -0,0 +1,28 @@
+"""
+离线构建高斯元的LOD树，保存在PLY文件旁边（<name>.lod.npz），查看器开启LOD时直接读取。
+用法（在仓库根目录下）：python -m tools.build_lod point_cloud.ply [--branching 8]
+"""
+
+import argparse
+import time
+
+import util_gau
+from render.gaussian_lod import GaussianLOD
+
+
+def build_lod(path, branching=8):
+    gaus = util_gau.load_ply(path)
+    start = time.perf_counter()
+    lod = GaussianLOD(gaus, branching)
+    print(f"Built LOD with {len(lod.gaussians)} nodes for {lod.num_leaves} gaussians "
+          f"in {time.perf_counter() - start:.1f}s")
+    lod.save(GaussianLOD.cache_path(gaus))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the LOD tree of a 3DGS PLY file offline.")
+    parser.add_argument("input", nargs='+', help="Path to the 3DGS point cloud file(s).")
+    parser.add_argument("--branching", "-b", type=int, default=8, help="Number of children merged into each node.")
+    args = parser.parse_args()
+    for path in args.input:
+        build_lod(path, args.branching)
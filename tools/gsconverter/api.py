@@ -0,0 +1,46 @@
+"""
+3D Gaussian Splatting Converter
+Copyright (c) 2023 Francesco Fugazzi
+
+This software is released under the MIT License.
+For more information about the license, please see the LICENSE file.
+"""
+
+import contextlib
+import io
+import numpy as np
+from plyfile import PlyData, PlyElement
+from .utils.conversion_functions import convert
+
+
+def convert_data(data, source_format="3dgs", target_format="3dgs", output=None, rgb=False, bbox=None,
+                 density_filter=False, remove_flyers=False, prune=False, decimate=None, sh_degree=None,
+                 sh_energy=False, verbose=False):
+    """
+    Convert in-memory Gaussian data without reading the source file again or prompting on the console.
+
+    `data` is a structured vertex array (the 'vertex' element of a PLY file) or any object with a
+    `to_structured_array()` method such as the viewer's GaussianData. The processing options match
+    the command line flags. Returns the converted structured array, or None when the conversion
+    was refused. When `output` is given the result is also written there, overwriting any existing
+    file. Progress messages are only printed when `verbose` is set.
+    """
+    if hasattr(data, 'to_structured_array'):
+        data = data.to_structured_array()
+    if not isinstance(data, np.ndarray) or data.dtype.names is None:
+        raise TypeError("data must be a numpy structured array or provide to_structured_array().")
+
+    stdout = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with stdout:
+        converted_data = convert(data, source_format, target_format, process_rgb=rgb, density_filter=density_filter,
+                                 remove_flyers=remove_flyers, prune=prune, decimate=decimate, sh_degree=sh_degree,
+                                 sh_energy=sh_energy, bbox=bbox)
+
+    if not isinstance(converted_data, np.ndarray):
+        return None
+
+    if output is not None:
+        if not output.lower().endswith('.ply'):
+            output += '.ply'
+        PlyData([PlyElement.describe(converted_data, 'vertex')], byte_order='=').write(output)
+    return converted_data
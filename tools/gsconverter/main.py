@@ -16,8 +16,9 @@ from plyfile import PlyData, PlyElement
 from multiprocessing import Pool
 from .utils import config
 from .utils.utility_functions import init_worker
-from .utils.argument_actions import DensityFilterAction, RemoveFlyersAction, AboutAction
+from .utils.argument_actions import DensityFilterAction, RemoveFlyersAction, PruneAction, AboutAction
 from .utils.base_converter import BaseConverter
+from .utils.profiler import StageProfiler, profile_stage
 
 __version__ = '0.1'
 
@@ -31,6 +32,8 @@ def gsconverter(args):
     print(f"3D Gaussian Splatting Converter: {__version__}")
 
     config.DEBUG = args.debug
+    profile = getattr(args, 'profile', None)
+    config.PROFILER = StageProfiler() if profile else None
 
     # Check and append ".ply" extension if absent
     if not args.output.lower().endswith('.ply'):
@@ -75,11 +78,15 @@ def gsconverter(args):
 
     # Read the data from the input file based on detected format
     if source_format == 'parquet':
-        structured_data = BaseConverter.load_parquet(args.input)
+        with profile_stage("read", num_bytes=os.path.getsize(args.input)) as stage:
+            structured_data = BaseConverter.load_parquet(args.input)
+            stage['splats'] = len(structured_data)
         
         print(f"Number of vertices: {len(structured_data)}")
     else:
-        data = PlyData.read(args.input)
+        with profile_stage("read", num_bytes=os.path.getsize(args.input)) as stage:
+            data = PlyData.read(args.input)
+            stage['splats'] = len(data['vertex'].data) if 'vertex' in data else 0
         if isinstance(data, PlyData) and 'vertex' in data:
             print(f"Number of vertices in the header: {len(data['vertex'].data)}")
             structured_data = data['vertex'].data
@@ -100,7 +107,7 @@ def gsconverter(args):
                 data_to_convert = data['vertex'].data
             
             # Call the convert function and pass the data to convert
-            converted_data = convert(data_to_convert, source_format, args.target_format, process_rgb=args.rgb, density_filter=args.density_filter, remove_flyers=args.remove_flyers, bbox=bbox_values, pool=pool)
+            converted_data = convert(data_to_convert, source_format, args.target_format, process_rgb=args.rgb, density_filter=args.density_filter, remove_flyers=args.remove_flyers, prune=getattr(args, 'prune', None), decimate=getattr(args, 'decimate', None), sh_degree=getattr(args, 'sh_degree', None), sh_energy=getattr(args, 'sh_energy', False), bbox=bbox_values, pool=pool)
             
     except KeyboardInterrupt:
         print("Caught KeyboardInterrupt, terminating workers")
@@ -111,13 +118,24 @@ def gsconverter(args):
     # Check if the conversion actually happened and save the result
     if isinstance(converted_data, np.ndarray):
         # Save the converted data to the output file
-        PlyData([PlyElement.describe(converted_data, 'vertex')], byte_order='=').write(args.output)
+        with profile_stage("write", len(converted_data), converted_data.nbytes):
+            PlyData([PlyElement.describe(converted_data, 'vertex')], byte_order='=').write(args.output)
         print(f"Conversion completed and saved to {args.output}.")
+        report_profile(profile)
         return True
     else:
         print("Conversion was skipped.")
+        report_profile(profile)
         return False
 
+def report_profile(profile):
+    # Print the per-stage profile and optionally save it as JSON
+    if config.PROFILER is None:
+        return
+    config.PROFILER.print_table()
+    if isinstance(profile, str):
+        config.PROFILER.write_json(profile)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Convert between standard 3D Gaussian Splat and Cloud Compare formats.")
     
@@ -144,7 +162,12 @@ if __name__ == "__main__":
     parser.add_argument("--bbox", nargs=6, type=float, metavar=('minX', 'minY', 'minZ', 'maxX', 'maxY', 'maxZ'), help="Specify the 3D bounding box to crop the point cloud.")
     parser.add_argument("--density_filter", nargs='*', action=DensityFilterAction, help="Filter the points to keep only regions with higher point density. Optionally provide 'voxel_size' and 'threshold_percentage' as two numbers (e.g., --density_filter 0.5 0.25). If no numbers are provided, defaults of 1.0 and 0.32 are used.")
     parser.add_argument("--remove_flyers", nargs='*', action=RemoveFlyersAction, help="Remove flyers based on k-nearest neighbors. Requires two numbers: 'k' (number of neighbors) and 'threshold_factor'.")
+    parser.add_argument("--prune", nargs='*', action=PruneAction, help="Drop near-invisible Gaussians. Optionally provide 'min_opacity', 'volume_ratio' and 'score_ratio' (ratios are relative to the scene median, e.g., --prune 0.004 0.001 0.001). If no numbers are provided, these defaults are used.")
+    parser.add_argument("--decimate", type=int, metavar='TARGET_COUNT', help="Merge Gaussians within voxels into moment-matched Gaussians until at most TARGET_COUNT remain (e.g., --decimate 1000000).")
+    parser.add_argument("--profile", nargs='?', const=True, metavar='JSON_PATH', help="Report wall time, CPU time, peak RSS and throughput for each stage. Optionally provide a path to also save the report as JSON.")
+    parser.add_argument("--sh_degree", type=int, choices=[0, 1, 2, 3], help="Truncate the spherical harmonics to the given degree (0 keeps only the DC color).")
+    parser.add_argument("--sh_energy", action="store_true", help="Report the energy of each SH band before any truncation.")
     
     args = parser.parse_args()
 
-    gsconverter(args)
\ No newline at end of file
+    gsconverter(vars(args))
\ No newline at end of file
@@ -33,6 +33,19 @@ class RemoveFlyersAction(argparse.Action):
         else:
             values = [25, 10.5]  # Default values if none are provided
         setattr(args, self.dest, values)
+
+class PruneAction(argparse.Action):
+    def __call__(self, parser, args, values, option_string=None):
+        if values:
+            if len(values) != 3:
+                parser.error("--prune requires three numbers: 'min_opacity', 'volume_ratio' and 'score_ratio'.")
+            try:
+                values = [float(v) for v in values]
+            except ValueError:
+                parser.error("All arguments for --prune must be numbers.")
+        else:
+            values = [0.004, 1e-3, 1e-3]  # Default values if none are provided
+        setattr(args, self.dest, values)
         
 class AboutAction(argparse.Action):
     def __init__(self, option_strings, dest, nargs=0, **kwargs):
@@ -15,9 +15,23 @@ from sklearn.neighbors import NearestNeighbors
 from .utility_functions import debug_print, init_worker
 
 class BaseConverter:
+    # Prefixes that 3DGS and CloudCompare files may put in front of the Gaussian fields
+    FIELD_PREFIXES = ["", "scal_", "scalar_", "scalar_scal_"]
+
     def __init__(self, data):
         self.data = data
 
+    def get_field_name(self, name):
+        """Return the actual name of the field `name` in self.data, whatever prefix the source format uses."""
+        for prefix in self.FIELD_PREFIXES:
+            if prefix + name in self.data.dtype.names:
+                return prefix + name
+        raise KeyError(f"Field '{name}' not found in data.")
+
+    def get_field(self, name):
+        """Return the column `name` of self.data, whatever prefix the source format uses."""
+        return self.data[self.get_field_name(name)]
+
     def extract_vertex_data(vertices, has_scal=True, has_rgb=False):
         """Extract and convert vertex data from a structured numpy array of vertices."""
         debug_print("[DEBUG] Executing 'extract_vertex_data' function...")
@@ -144,8 +158,229 @@ class BaseConverter:
         print(f"After removing flyers, retained {np.count_nonzero(combined_mask)} out of {num_vertices} vertices.")
         return self.data
 
+    def prune(self, min_opacity=0.004, volume_ratio=1e-3, score_ratio=1e-3):
+        """
+        Drop Gaussians that contribute nothing visible.
+
+        A splat is removed when its activated opacity is below `min_opacity`, when the volume of
+        its ellipsoid is below `volume_ratio` times the median volume, or when its opacity times
+        its largest cross-section area is below `score_ratio` times the median of that score.
+        """
+        debug_print("[DEBUG] Executing 'prune' function...")
+
+        # Ensure self.data is a numpy structured array
+        if not isinstance(self.data, np.ndarray):
+            raise TypeError("self.data must be a numpy structured array.")
+
+        vertices = self.data
+        num_vertices = len(vertices)
+        if num_vertices == 0:
+            return self.data
+
+        # Opacity and scales are stored pre-activation (logit and log)
+        logit_opacity = self.get_field('opacity').astype(np.float64)
+        log_scales = np.column_stack([self.get_field(f'scale_{i}') for i in range(3)]).astype(np.float64)
+
+        # Work in log space so tiny volumes and opacities do not underflow
+        log_volume = log_scales.sum(axis=1)
+        # Largest cross-section of the ellipsoid: product of the two largest axes
+        log_footprint = log_volume - log_scales.min(axis=1)
+        # log(sigmoid(x)) = -log(1 + exp(-x)), without overflowing for very negative logits
+        log_score = -np.logaddexp(0.0, -logit_opacity) + log_footprint
+
+        # The sigmoid is monotonic, so the opacity threshold is compared in logit space
+        low_opacity = logit_opacity < np.log(min_opacity) - np.log1p(-min_opacity)
+        low_volume = log_volume < np.median(log_volume) + np.log(volume_ratio)
+        low_score = log_score < np.median(log_score) + np.log(score_ratio)
+        debug_print(f"[DEBUG] Prune thresholds: opacity < {min_opacity}, volume ratio < {volume_ratio}, score ratio < {score_ratio}")
+
+        mask = ~(low_opacity | low_volume | low_score)
+        self.data = vertices[mask]
+
+        print(f"Pruning flagged {np.count_nonzero(low_opacity)} splats by opacity, "
+              f"{np.count_nonzero(low_volume)} by volume and {np.count_nonzero(low_score)} by opacity x footprint.")
+        print(f"After pruning, retained {np.count_nonzero(mask)} out of {num_vertices} vertices.")
+        return self.data
+
+    @staticmethod
+    def find_voxel_size(xyz, target_count, max_iterations=24, tolerance=0.03):
+        """Search the voxel size whose number of occupied voxels is just within `target_count`."""
+        debug_print("[DEBUG] Executing 'find_voxel_size' function...")
+        extent = float(np.max(xyz.max(axis=0) - xyz.min(axis=0)))
+        if extent <= 0:
+            return 1.0
+
+        # `small` always overshoots the budget, `large` always fits it (a single voxel)
+        small, large = extent / 2 ** 20, extent * 1.0001
+        voxel_size = extent / np.cbrt(target_count)
+        for _ in range(max_iterations):
+            count = len(np.unique(Utility.voxel_keys(xyz, voxel_size)))
+            debug_print(f"[DEBUG] Voxel size {voxel_size:.6g} gives {count} occupied voxels.")
+            if count > target_count:
+                small = voxel_size
+            else:
+                large = voxel_size
+                if count >= (1 - tolerance) * target_count:
+                    break
+            voxel_size = np.sqrt(small * large)
+        return large
+
+    def decimate(self, target_count, max_iterations=24):
+        """
+        Reduce the scene to at most `target_count` Gaussians.
+
+        Splats sharing a voxel are merged into one moment-matched Gaussian: opacity-weighted mean
+        position, opacity-weighted covariance (member covariances plus the spread of their means)
+        and opacity-weighted average of every other field such as the SH coefficients. The merged
+        opacity keeps the summed opacity x footprint of the members. The voxel size is searched
+        automatically until the number of occupied voxels fits the budget.
+        """
+        debug_print("[DEBUG] Executing 'decimate' function...")
+
+        # Ensure self.data is a numpy structured array
+        if not isinstance(self.data, np.ndarray):
+            raise TypeError("self.data must be a numpy structured array.")
+
+        vertices = self.data
+        num_vertices = len(vertices)
+        if num_vertices <= target_count:
+            print(f"Scene has {num_vertices} vertices, no decimation needed for a budget of {target_count}.")
+            return self.data
+
+        xyz = np.column_stack((vertices['x'], vertices['y'], vertices['z'])).astype(np.float64)
+        voxel_size = self.find_voxel_size(xyz, target_count, max_iterations)
+        _, first_index, inverse, counts = np.unique(Utility.voxel_keys(xyz, voxel_size), return_index=True, return_inverse=True, return_counts=True)
+        inverse = inverse.reshape(-1)
+        num_groups = len(counts)
+        merged = counts > 1
+        debug_print(f"[DEBUG] Voxel size {voxel_size:.6g}: {np.count_nonzero(merged)} of {num_groups} voxels need merging.")
+
+        opacity_name = self.get_field_name('opacity')
+        scale_names = [self.get_field_name(f'scale_{i}') for i in range(3)]
+        rot_names = [self.get_field_name(f'rot_{i}') for i in range(4)]
+
+        # Activate opacity, scales and rotations
+        opacity = 1.0 / (1.0 + np.exp(-vertices[opacity_name].astype(np.float64)))
+        scales = np.exp(np.column_stack([vertices[name] for name in scale_names]).astype(np.float64))
+        quats = np.column_stack([vertices[name] for name in rot_names]).astype(np.float64)
+        quats /= np.maximum(np.linalg.norm(quats, axis=1, keepdims=True), 1e-12)
+        R = Utility.quaternion_to_rotation_matrix(quats)
+        cov = (R * np.square(scales)[:, None, :]) @ R.transpose(0, 2, 1)
+
+        weights = np.maximum(opacity, 1e-6)
+        weight_sum = np.bincount(inverse, weights, minlength=num_groups)
+
+        def group_mean(values):
+            return np.bincount(inverse, weights * values, minlength=num_groups) / weight_sum
+
+        # Moment matching: first moment, then second moment about the merged mean
+        mean = np.column_stack([group_mean(xyz[:, i]) for i in range(3)])
+        offset = xyz - mean[inverse]
+        second_moment = cov + offset[:, :, None] * offset[:, None, :]
+        merged_cov = np.empty((num_groups, 3, 3))
+        for i in range(3):
+            for j in range(i, 3):
+                merged_cov[:, i, j] = merged_cov[:, j, i] = group_mean(second_moment[:, i, j])
+
+        eigvals, eigvecs = np.linalg.eigh(merged_cov)
+        eigvecs[np.linalg.det(eigvecs) < 0, :, 0] *= -1  # Keep a proper rotation
+        merged_scales = np.sqrt(np.maximum(eigvals, 1e-20))
+        merged_quats = Utility.rotation_matrix_to_quaternion(eigvecs)
+
+        # Keep the visible mass (opacity x largest cross-section area), but never exceed the
+        # opacity of all members stacked on top of each other
+        footprint = np.prod(scales, axis=1) / np.min(scales, axis=1)
+        merged_footprint = np.prod(merged_scales, axis=1) / np.min(merged_scales, axis=1)
+        mass = np.bincount(inverse, opacity * footprint, minlength=num_groups)
+        stacked_opacity = 1 - np.exp(np.bincount(inverse, np.log1p(-np.minimum(opacity, 1 - 1e-6)), minlength=num_groups))
+        merged_opacity = np.clip(np.minimum(mass / merged_footprint, stacked_opacity), 1e-6, 1 - 1e-6)
+
+        # Single-member voxels are copied unchanged, merged ones are overwritten below
+        decimated = vertices[first_index].copy()
+        handled = {'x', 'y', 'z', opacity_name, *scale_names, *rot_names}
+        for i, name in enumerate(('x', 'y', 'z')):
+            decimated[name][merged] = mean[merged, i]
+        decimated[opacity_name][merged] = np.log(merged_opacity[merged] / (1 - merged_opacity[merged]))
+        for i, name in enumerate(scale_names):
+            decimated[name][merged] = np.log(merged_scales[merged, i])
+        for i, name in enumerate(rot_names):
+            decimated[name][merged] = merged_quats[merged, i]
+        for name in vertices.dtype.names:
+            if name not in handled:
+                decimated[name][merged] = group_mean(vertices[name].astype(np.float64))[merged]
+
+        self.data = decimated
+
+        print(f"After decimation with voxel size {voxel_size:.6g}, retained {num_groups} out of {num_vertices} vertices.")
+        return self.data
+
+    @staticmethod
+    def sh_rest_count(sh_degree):
+        """Number of f_rest_* fields (all three color channels) for a given SH degree."""
+        return 3 * ((sh_degree + 1) ** 2 - 1)
+
+    def get_sh_degree(self):
+        """SH degree of self.data, derived from the number of f_rest_* fields."""
+        num_rest = sum(1 for name in self.data.dtype.names if 'f_rest_' in name)
+        return int(round(np.sqrt(num_rest / 3 + 1))) - 1
+
+    def sh_band_energy(self):
+        """Mean squared SH coefficient per band (band 0 is the DC term), summed over RGB."""
+        debug_print("[DEBUG] Executing 'sh_band_energy' function...")
+        sh_degree = self.get_sh_degree()
+        coeffs_per_channel = (sh_degree + 1) ** 2 - 1
+
+        energies = [sum(np.mean(np.square(self.get_field(f'f_dc_{c}').astype(np.float64))) for c in range(3))]
+        for band in range(1, sh_degree + 1):
+            band_start, band_end = band ** 2 - 1, (band + 1) ** 2 - 1
+            energy = 0.0
+            for c in range(3):
+                for k in range(band_start, band_end):
+                    energy += np.mean(np.square(self.get_field(f'f_rest_{c * coeffs_per_channel + k}').astype(np.float64)))
+            energies.append(energy)
+        return energies
+
+    def reduce_sh_degree(self, sh_degree):
+        """Truncate the SH bands above `sh_degree`, keeping the channel-major f_rest_* layout."""
+        debug_print("[DEBUG] Executing 'reduce_sh_degree' function...")
+
+        # Ensure self.data is a numpy structured array
+        if not isinstance(self.data, np.ndarray):
+            raise TypeError("self.data must be a numpy structured array.")
+
+        current_degree = self.get_sh_degree()
+        if sh_degree >= current_degree:
+            print(f"SH degree is already {current_degree}, nothing to truncate.")
+            return self.data
+
+        # f_rest_* holds all coefficients of R, then of G, then of B
+        old_per_channel = (current_degree + 1) ** 2 - 1
+        new_per_channel = (sh_degree + 1) ** 2 - 1
+
+        new_dtype = []
+        field_mapping = {}
+        for name in self.data.dtype.names:
+            if 'f_rest_' in name:
+                prefix, index = name.split('f_rest_')
+                channel, coeff = divmod(int(index), old_per_channel)
+                if coeff >= new_per_channel:
+                    continue
+                new_name = f'{prefix}f_rest_{channel * new_per_channel + coeff}'
+            else:
+                new_name = name
+            field_mapping[name] = new_name
+            new_dtype.append((new_name, self.data.dtype[name]))
+
+        reduced_data = np.zeros(self.data.shape, dtype=new_dtype)
+        for name, new_name in field_mapping.items():
+            reduced_data[new_name] = self.data[name]
+        self.data = reduced_data
+
+        print(f"Reduced SH degree from {current_degree} to {sh_degree}, keeping {self.sh_rest_count(sh_degree)} f_rest fields.")
+        return self.data
+
     @staticmethod
-    def define_dtype(has_scal, has_rgb=False):
+    def define_dtype(has_scal, has_rgb=False, sh_degree=3):
         debug_print("[DEBUG] Executing 'define_dtype' function...")
         
         prefix = 'scalar_scal_' if has_scal else ''
@@ -155,7 +390,7 @@ class BaseConverter:
             ('x', 'f4'), ('y', 'f4'), ('z', 'f4'),
             ('nx', 'f4'), ('ny', 'f4'), ('nz', 'f4'),
             (f'{prefix}f_dc_0', 'f4'), (f'{prefix}f_dc_1', 'f4'), (f'{prefix}f_dc_2', 'f4'),
-            *[(f'{prefix}f_rest_{i}', 'f4') for i in range(45)],
+            *[(f'{prefix}f_rest_{i}', 'f4') for i in range(BaseConverter.sh_rest_count(sh_degree))],
             (f'{prefix}opacity', 'f4'),
             (f'{prefix}scale_0', 'f4'), (f'{prefix}scale_1', 'f4'), (f'{prefix}scale_2', 'f4'),
             (f'{prefix}rot_0', 'f4'), (f'{prefix}rot_1', 'f4'), (f'{prefix}rot_2', 'f4'), (f'{prefix}rot_3', 'f4')
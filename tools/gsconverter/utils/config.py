@@ -7,3 +7,6 @@ For more information about the license, please see the LICENSE file.
 """
 
 DEBUG = False
+
+# Active StageProfiler when --profile is set
+PROFILER = None
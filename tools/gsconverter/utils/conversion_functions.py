@@ -12,6 +12,7 @@ from .format_cc import FormatCC
 from .format_parquet import FormatParquet
 from .utility_functions import debug_print
 from .data_processing import process_data  # Place this import statement at the top with other imports
+from .profiler import profile_stage
 
 def convert(data, source_format, target_format, **kwargs):
     debug_print(f"[DEBUG] Starting conversion from {source_format} to {target_format}...")
@@ -26,7 +27,7 @@ def convert(data, source_format, target_format, **kwargs):
         raise ValueError("Unsupported source format")
     
     # Apply optional pre-processing steps using process_data (newly added)
-    process_data(converter, bbox=kwargs.get("bbox"), apply_density_filter=kwargs.get("density_filter"), remove_flyers=kwargs.get("remove_flyers"))
+    process_data(converter, bbox=kwargs.get("bbox"), apply_density_filter=kwargs.get("density_filter"), remove_flyers=kwargs.get("remove_flyers"), prune=kwargs.get("prune"), decimate=kwargs.get("decimate"), sh_degree=kwargs.get("sh_degree"), report_sh_energy=kwargs.get("sh_energy"))
 
     # RGB processing
     if source_format == "cc":
@@ -37,32 +38,33 @@ def convert(data, source_format, target_format, **kwargs):
         converter.add_or_ignore_rgb(process_rgb=kwargs.get("process_rgb", False))
 
     # Conversion operations
-    process_rgb_flag = kwargs.get("process_rgb", False)
-    if source_format == "3dgs" and target_format == "cc":
-        debug_print("[DEBUG] Converting 3DGS to CC...")
-        return converter.to_cc(process_rgb=process_rgb_flag)
-    elif source_format == "cc" and target_format == "3dgs":
-        debug_print("[DEBUG] Converting CC to 3DGS...")
-        return converter.to_3dgs()
-    elif source_format == "parquet" and target_format == "cc":
-        debug_print("[DEBUG] Converting Parquet to CC...")
-        return converter.to_cc(process_rgb=process_rgb_flag)
-    elif source_format == "parquet" and target_format == "3dgs":
-        debug_print("[DEBUG] Converting Parquet to 3DGS...")
-        return converter.to_3dgs()
-    elif source_format == "3dgs" and target_format == "3dgs":
-        debug_print("[DEBUG] Applying operations on 3DGS data...")
-        if not any(kwargs.values()):  # If no flags are provided
-            print("[INFO] No flags provided. The conversion will not happen as the output would be identical to the input.")
-            return data['vertex'].data
-        else:
+    with profile_stage("format conversion", len(converter.data), converter.data.nbytes):
+        process_rgb_flag = kwargs.get("process_rgb", False)
+        if source_format == "3dgs" and target_format == "cc":
+            debug_print("[DEBUG] Converting 3DGS to CC...")
+            return converter.to_cc(process_rgb=process_rgb_flag)
+        elif source_format == "cc" and target_format == "3dgs":
+            debug_print("[DEBUG] Converting CC to 3DGS...")
+            return converter.to_3dgs()
+        elif source_format == "parquet" and target_format == "cc":
+            debug_print("[DEBUG] Converting Parquet to CC...")
+            return converter.to_cc(process_rgb=process_rgb_flag)
+        elif source_format == "parquet" and target_format == "3dgs":
+            debug_print("[DEBUG] Converting Parquet to 3DGS...")
             return converter.to_3dgs()
-    elif source_format == "cc" and target_format == "cc":
-        debug_print("[DEBUG] Applying operations on CC data...")
-        converted_data = converter.to_cc()
-        if isinstance(converted_data, np.ndarray):
-            return converted_data
+        elif source_format == "3dgs" and target_format == "3dgs":
+            debug_print("[DEBUG] Applying operations on 3DGS data...")
+            if not any(kwargs.values()):  # If no flags are provided
+                print("[INFO] No flags provided. The conversion will not happen as the output would be identical to the input.")
+                return data
+            else:
+                return converter.to_3dgs()
+        elif source_format == "cc" and target_format == "cc":
+            debug_print("[DEBUG] Applying operations on CC data...")
+            converted_data = converter.to_cc()
+            if isinstance(converted_data, np.ndarray):
+                return converted_data
+            else:
+                return data
         else:
-            return data['vertex'].data
-    else:
-        raise ValueError("Unsupported conversion")
\ No newline at end of file
+            raise ValueError("Unsupported conversion")
\ No newline at end of file
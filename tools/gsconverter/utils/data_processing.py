@@ -7,20 +7,52 @@ For more information about the license, please see the LICENSE file.
 """
 
 from .utility_functions import debug_print
+from .profiler import profile_stage
 
-def process_data(data_object, bbox=None, apply_density_filter=False, remove_flyers=False):
+def process_data(data_object, bbox=None, apply_density_filter=False, remove_flyers=False, prune=False, decimate=None, sh_degree=None, report_sh_energy=False):
     # Crop the data based on the bounding box if specified
     if bbox:
         min_x, min_y, min_z, max_x, max_y, max_z = bbox
-        data_object.crop_by_bbox(min_x, min_y, min_z, max_x, max_y, max_z)
+        with profile_stage("crop_by_bbox", len(data_object.data), data_object.data.nbytes):
+            data_object.crop_by_bbox(min_x, min_y, min_z, max_x, max_y, max_z)
         debug_print("[DEBUG] Bounding box cropped.")
         
     # Apply density filter if required
     if apply_density_filter:
-        data_object.data = data_object.apply_density_filter()
+        with profile_stage("apply_density_filter", len(data_object.data), data_object.data.nbytes):
+            data_object.data = data_object.apply_density_filter()
         debug_print("[DEBUG] Density filter applied.")
 
     # Remove flyers if required
     if remove_flyers:
-        data_object.data = data_object.remove_flyers()
-        debug_print("[DEBUG] Flyers removed.")
\ No newline at end of file
+        with profile_stage("remove_flyers", len(data_object.data), data_object.data.nbytes):
+            data_object.data = data_object.remove_flyers()
+        debug_print("[DEBUG] Flyers removed.")
+
+    # Prune near-invisible Gaussians if required
+    if prune:
+        prune_params = prune if isinstance(prune, (list, tuple)) else []
+        with profile_stage("prune", len(data_object.data), data_object.data.nbytes):
+            data_object.data = data_object.prune(*prune_params)
+        debug_print("[DEBUG] Near-invisible Gaussians pruned.")
+
+    # Merge Gaussians down to a fixed budget if required
+    if decimate:
+        with profile_stage("decimate", len(data_object.data), data_object.data.nbytes):
+            data_object.data = data_object.decimate(int(decimate))
+        debug_print("[DEBUG] Decimation applied.")
+
+    # Report the per-band SH energy before any truncation
+    if report_sh_energy:
+        energies = data_object.sh_band_energy()
+        total_energy = sum(energies)
+        print("SH band energy (mean squared coefficient, RGB summed):")
+        for band, energy in enumerate(energies):
+            share = energy / total_energy if total_energy > 0 else 0.0
+            print(f"  band {band}: {energy:.6g} ({share:.2%})")
+
+    # Truncate the higher SH bands if required
+    if sh_degree is not None:
+        with profile_stage("reduce_sh_degree", len(data_object.data), data_object.data.nbytes):
+            data_object.data = data_object.reduce_sh_degree(sh_degree)
+        debug_print(f"[DEBUG] SH degree reduced to {sh_degree}.")
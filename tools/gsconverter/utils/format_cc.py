@@ -21,7 +21,7 @@ class FormatCC(BaseConverter):
         debug_print(f"[DEBUG] Loaded {len(vertices)} vertices.")
 
         # Create a new structured numpy array for 3DGS format
-        dtype_3dgs = self.define_dtype(has_scal=False, has_rgb=False)  # Define 3DGS dtype without any prefix
+        dtype_3dgs = self.define_dtype(has_scal=False, has_rgb=False, sh_degree=self.get_sh_degree())  # Define 3DGS dtype without any prefix
         converted_data = np.zeros(vertices.shape, dtype=dtype_3dgs)
 
         # Use the helper function to copy the data from vertices to converted_data
@@ -62,7 +62,7 @@ class FormatCC(BaseConverter):
             rgb_values = Utility.compute_rgb_from_vertex(self.data)
 
             # Get the new dtype definition from the BaseConverter class
-            new_dtype_list, _ = BaseConverter.define_dtype(has_scal=True, has_rgb=True)
+            new_dtype_list, _ = BaseConverter.define_dtype(has_scal=True, has_rgb=True, sh_degree=self.get_sh_degree())
             new_dtype = np.dtype(new_dtype_list)
 
             # Create a new structured array that includes fields for RGB
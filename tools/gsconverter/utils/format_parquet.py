@@ -29,7 +29,7 @@ class FormatParquet(BaseConverter):
 
             if rgb_values is not None:
                 # Define a new data type for the vertices that includes RGB
-                new_dtype, prefix = BaseConverter.define_dtype(has_scal=True, has_rgb=True)
+                new_dtype, prefix = BaseConverter.define_dtype(has_scal=True, has_rgb=True, sh_degree=self.get_sh_degree())
 
                 # Create a new numpy array with the new data type
                 converted_data = np.zeros(vertices.shape, dtype=new_dtype)
@@ -51,7 +51,7 @@ class FormatParquet(BaseConverter):
             debug_print("[DEBUG] RGB processing is skipped.")
 
             # Define a new data type for the vertices without RGB
-            new_dtype, prefix = BaseConverter.define_dtype(has_scal=True, has_rgb=False)
+            new_dtype, prefix = BaseConverter.define_dtype(has_scal=True, has_rgb=False, sh_degree=self.get_sh_degree())
 
             # Create a new numpy array with the new data type
             converted_data = np.zeros(vertices.shape, dtype=new_dtype)
@@ -71,7 +71,7 @@ class FormatParquet(BaseConverter):
         debug_print(f"[DEBUG] Loaded {len(vertices)} vertices.")
 
         # Create a new structured numpy array for 3DGS format
-        dtype_3dgs = self.define_dtype(has_scal=False, has_rgb=False)  # Define 3DGS dtype without any prefix
+        dtype_3dgs = self.define_dtype(has_scal=False, has_rgb=False, sh_degree=self.get_sh_degree())  # Define 3DGS dtype without any prefix
         converted_data = np.zeros(vertices.shape, dtype=dtype_3dgs)
 
         # Use the helper function to copy the data from vertices to converted_data
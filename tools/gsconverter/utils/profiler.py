@@ -0,0 +1,86 @@
+"""
+3D Gaussian Splatting Converter
+Copyright (c) 2023 Francesco Fugazzi
+
+This software is released under the MIT License.
+For more information about the license, please see the LICENSE file.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from . import config
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def peak_rss_bytes():
+    """Return the peak resident set size of this process in bytes, or None if it cannot be measured."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS reports bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    if psutil is not None:
+        memory_info = psutil.Process(os.getpid()).memory_info()
+        return getattr(memory_info, 'peak_wset', memory_info.rss)
+    return None
+
+
+class StageProfiler:
+    """Collects wall time, CPU time, peak RSS and throughput for each converter stage."""
+
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, num_splats=None, num_bytes=None):
+        record = {'stage': name, 'splats': num_splats, 'bytes': num_bytes}
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_s'] = time.perf_counter() - wall_start
+            record['cpu_s'] = time.process_time() - cpu_start
+            record['peak_rss_bytes'] = peak_rss_bytes()
+            wall = record['wall_s']
+            record['splats_per_s'] = record['splats'] / wall if record['splats'] is not None and wall > 0 else None
+            record['mb_per_s'] = record['bytes'] / 1e6 / wall if record['bytes'] is not None and wall > 0 else None
+            self.stages.append(record)
+
+    def print_table(self):
+        print(f"{'Stage':<24}{'Wall (s)':>10}{'CPU (s)':>10}{'Peak RSS (MB)':>15}{'Splats':>12}{'Splats/s':>14}{'MB/s':>10}")
+        for record in self.stages:
+            peak = f"{record['peak_rss_bytes'] / 2 ** 20:.1f}" if record['peak_rss_bytes'] is not None else "n/a"
+            splats = f"{record['splats']}" if record['splats'] is not None else "-"
+            splats_per_s = f"{record['splats_per_s']:.0f}" if record['splats_per_s'] is not None else "-"
+            mb_per_s = f"{record['mb_per_s']:.1f}" if record['mb_per_s'] is not None else "-"
+            print(f"{record['stage']:<24}{record['wall_s']:>10.3f}{record['cpu_s']:>10.3f}{peak:>15}{splats:>12}{splats_per_s:>14}{mb_per_s:>10}")
+        total_wall = sum(record['wall_s'] for record in self.stages)
+        total_cpu = sum(record['cpu_s'] for record in self.stages)
+        print(f"{'total':<24}{total_wall:>10.3f}{total_cpu:>10.3f}")
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as json_file:
+            json.dump({'stages': self.stages}, json_file, indent=2)
+        print(f"Profile written to {path}.")
+
+
+@contextmanager
+def profile_stage(name, num_splats=None, num_bytes=None):
+    """Profile a stage with the active profiler; does nothing when profiling is disabled."""
+    if config.PROFILER is None:
+        yield {}
+        return
+    with config.PROFILER.stage(name, num_splats, num_bytes) as record:
+        yield record
@@ -146,4 +146,48 @@ class Utility:
         
         debug_print(f"[DEBUG] Average distance computed for vertex: {args[0]} is {avg_distance}.")
         return avg_distance
-    
\ No newline at end of file
+
+    @staticmethod
+    def voxel_keys(xyz, voxel_size):
+        """Return a linear int64 key of the voxel containing each point."""
+        coords = np.floor((xyz - xyz.min(axis=0)) / voxel_size).astype(np.int64)
+        dims = coords.max(axis=0) + 1
+        return (coords[:, 0] * dims[1] + coords[:, 1]) * dims[2] + coords[:, 2]
+
+    @staticmethod
+    def quaternion_to_rotation_matrix(q):
+        """Convert (N, 4) normalized quaternions in (w, x, y, z) order to (N, 3, 3) rotation matrices."""
+        r, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+        R = np.empty((len(q), 3, 3), dtype=q.dtype)
+        R[:, 0, 0] = 1 - 2 * (y * y + z * z)
+        R[:, 0, 1] = 2 * (x * y - r * z)
+        R[:, 0, 2] = 2 * (x * z + r * y)
+        R[:, 1, 0] = 2 * (x * y + r * z)
+        R[:, 1, 1] = 1 - 2 * (x * x + z * z)
+        R[:, 1, 2] = 2 * (y * z - r * x)
+        R[:, 2, 0] = 2 * (x * z - r * y)
+        R[:, 2, 1] = 2 * (y * z + r * x)
+        R[:, 2, 2] = 1 - 2 * (x * x + y * y)
+        return R
+
+    @staticmethod
+    def rotation_matrix_to_quaternion(R):
+        """Convert (N, 3, 3) rotation matrices to (N, 4) quaternions in (w, x, y, z) order."""
+        m00, m01, m02 = R[:, 0, 0], R[:, 0, 1], R[:, 0, 2]
+        m10, m11, m12 = R[:, 1, 0], R[:, 1, 1], R[:, 1, 2]
+        m20, m21, m22 = R[:, 2, 0], R[:, 2, 1], R[:, 2, 2]
+
+        # Shepperd's method: pick the numerically largest component for each matrix
+        t = np.stack([1 + m00 + m11 + m22, 1 + m00 - m11 - m22, 1 - m00 + m11 - m22, 1 - m00 - m11 + m22], axis=1)
+        choice = np.argmax(t, axis=1)
+        s = 2 * np.sqrt(np.maximum(t[np.arange(len(R)), choice], 1e-12))
+
+        candidates = np.stack([
+            np.stack([s / 4, (m21 - m12) / s, (m02 - m20) / s, (m10 - m01) / s], axis=1),
+            np.stack([(m21 - m12) / s, s / 4, (m01 + m10) / s, (m02 + m20) / s], axis=1),
+            np.stack([(m02 - m20) / s, (m01 + m10) / s, s / 4, (m12 + m21) / s], axis=1),
+            np.stack([(m10 - m01) / s, (m02 + m20) / s, (m12 + m21) / s, s / 4], axis=1),
+        ], axis=1)
+        q = candidates[np.arange(len(R)), choice]
+        return q / np.linalg.norm(q, axis=1, keepdims=True)
+
@@ -318,7 +318,11 @@ def set_storage_buffer_data(program, key, value: np.ndarray, bind_idx, vao=None,
     if buffer_id is None:
         buffer_id = glGenBuffers(1)
     glBindBuffer(GL_SHADER_STORAGE_BUFFER, buffer_id)
-    glBufferData(GL_SHADER_STORAGE_BUFFER, value.nbytes, value.reshape(-1), GL_STATIC_DRAW)
+    # 已有缓冲区容量足够时只更新数据，避免重新分配显存
+    if glGetBufferParameteriv(GL_SHADER_STORAGE_BUFFER, GL_BUFFER_SIZE) >= value.nbytes:
+        glBufferSubData(GL_SHADER_STORAGE_BUFFER, 0, value.nbytes, value.reshape(-1))
+    else:
+        glBufferData(GL_SHADER_STORAGE_BUFFER, value.nbytes, value.reshape(-1), GL_STATIC_DRAW)
     # pos = glGetProgramResourceIndex(program, GL_SHADER_STORAGE_BLOCK, key)  # TODO: ???
     glBindBufferBase(GL_SHADER_STORAGE_BUFFER, bind_idx, buffer_id)
     # glShaderStorageBlockBinding(program, pos, pos)  # TODO: ???
@@ -455,6 +459,20 @@ def update_texture2d(img, texid, offset):
         GL_RGB, GL_UNSIGNED_BYTE, img
     )
 
+def frustum_planes(view_proj, guard_band=1.3):
+    """
+    视锥的6个平面(a, b, c, d)，法向量已归一化并指向视锥内部，点到平面的距离为 xyz·(a, b, c) + d。
+    左右上下平面放宽到guard_band倍的NDC范围，近平面和远平面不放宽。
+    """
+    m = np.asarray(view_proj, dtype=np.float32)
+    planes = np.stack([
+        m[3] * guard_band + m[0], m[3] * guard_band - m[0],
+        m[3] * guard_band + m[1], m[3] * guard_band - m[1],
+        m[3] + m[2], m[3] - m[2],
+    ])
+    planes /= np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+    return planes
+
 def convert_euler_angles_to_rotation_matrix(angles):
     # Convert angles from degrees to radians
     angles = np.radians(angles)
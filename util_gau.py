@@ -4,7 +4,8 @@ from dataclasses import dataclass, field
 import scipy as sp
 import util
 import argparse
-from tools.gsconverter.main import gsconverter
+from tools.gsconverter.api import convert_data
+from tools.gsconverter.utils.base_converter import BaseConverter
 import pandas as pd
 
 @dataclass
@@ -75,6 +76,30 @@ class GaussianData:
     @property 
     def sh_dim(self):
         return self.sh.shape[-1]
+
+    def to_structured_array(self, original=True):
+        """打包为3DGS PLY的vertex结构化数组（激活前的数值），original=True时使用未缩放的原始数据"""
+        source = self.get_original_state if original else self
+        num_points = len(source)
+        sh_degree = int(round(np.sqrt(source.sh_dim / 3))) - 1
+        dtype, _ = BaseConverter.define_dtype(has_scal=False, has_rgb=False, sh_degree=sh_degree)
+        vertices = np.zeros(num_points, dtype=dtype)
+
+        vertices['x'], vertices['y'], vertices['z'] = source.xyz.T
+        for i in range(3):
+            vertices[f'f_dc_{i}'] = source.sh[:, i]
+        # sh中高阶系数按(系数, RGB)交错存储，PLY中按通道连续存储
+        features_extra = source.sh[:, 3:].reshape(num_points, -1, 3).transpose(0, 2, 1).reshape(num_points, -1)
+        for i in range(features_extra.shape[1]):
+            vertices[f'f_rest_{i}'] = features_extra[:, i]
+        # 反激活：opacity取logit，scale取log（饱和的opacity会被截断以避免无穷大）
+        opacity = np.clip(source.opacity[:, 0].astype(np.float64), 1e-7, 1 - 1e-7)
+        vertices['opacity'] = np.log(opacity / (1 - opacity))
+        for i in range(3):
+            vertices[f'scale_{i}'] = np.log(source.scale[:, i])
+        for i in range(4):
+            vertices[f'rot_{i}'] = source.rot[:, i]
+        return vertices
     
     @property
     def points_center(self):
@@ -234,7 +259,6 @@ def naive_gaussian():
 
 # 使用pandas加载ply速度较快
 def load_ply(path):
-    max_sh_degree = 3
     plydata = PlyData.read(path)
     
     # 创建一个包含所有相关数据的 DataFrame
@@ -274,7 +298,8 @@ def load_ply(path):
         **{name: np.asarray(plydata.elements[0][name]) for name in rot_names}
     })
 
-    # 处理 features_extra
+    # 处理 features_extra，SH阶数由f_rest_*的数量推断（支持截断过阶数的文件）
+    max_sh_degree = int(round(np.sqrt(len(extra_f_names) / 3 + 1))) - 1
     features_extra = all_features[extra_f_names].values
     features_extra = features_extra.reshape((features_extra.shape[0], 3, (max_sh_degree + 1) ** 2 - 1))
     features_extra = np.transpose(features_extra, [0, 2, 1])
@@ -393,26 +418,11 @@ def export_ply(gaussian_data, output_path, enable_aabb, enable_obb, cube_min, cu
         transformed_points = pd.DataFrame(transformed_points, columns=['x', 'y', 'z'])
         mask = (transformed_points >= cube_min_point).all(axis=1) & (transformed_points <= cube_max_point).all(axis=1)
         
-    # 获取原始数据的副本
-    original_data = gaussian_data.get_original_state
-    # 应用掩码并计算边界框
-    filtered_xyz = original_data.xyz[mask]  # 使用原始数据
-    bbox_values = tuple(np.concatenate([np.min(filtered_xyz, axis=0), np.max(filtered_xyz, axis=0)]).tolist()) if filtered_xyz.size > 0 else None
-
-    # 准备转换参数
-    convertargs = {
-        'input': gaussian_data.path,  # 使用GaussianData中的路径
-        'output': output_path,
-        'target_format': "3dgs",
-        'debug': False,  # 根据需要设置debug模式
-        'rgb': False,  # 根据实际情况设置rgb参数
-        'bbox': bbox_values,  # 设置计算出的bbox参数
-        'density_filter': False, # 如果需要，设置density_filter参数
-        'remove_flyers': False # 如果需要，设置remove_flyers参数
-    }
+    # 直接在内存中导出掩码内的原始数据，不再重新读取原始PLY文件
+    vertices = gaussian_data.to_structured_array()[np.asarray(mask)]
     try:
-        success = gsconverter(convertargs)
-        return success
+        converted_data = convert_data(vertices, source_format="3dgs", target_format="3dgs", output=output_path)
+        return converted_data is not None
     except Exception as e:
         print(e)
         return False